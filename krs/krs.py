@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 
 import typer, os
+from typing import List, Optional
 from krs.main import KrsMain
-from krs.utils.constants import KRSSTATE_PICKLE_FILEPATH, KRS_DATA_DIRECTORY
+from krs.utils.hf_loader import PRECISIONS
+from krs.utils.constants import (KRSSTATE_PICKLE_FILEPATH, KRS_DATA_DIRECTORY, WATCH_DEBOUNCE_SECONDS,
+                                 WATCH_COOLDOWN_SECONDS, WATCH_LOG_TAIL_LINES, SCAN_CACHE_TTL_SECONDS, SERVER_HOST,
+                                 SERVER_PORT, SERVER_REFRESH_SECONDS)
 
 app = typer.Typer(help="krs: A command line interface to scan your Kubernetes Cluster, detect errors, provide resolutions using LLMs and recommend latest tools for your cluster")
 krs = KrsMain()
@@ -12,6 +16,12 @@ def check_initialized():
         typer.echo("KRS is not initialized. Please run 'krs init' first.")
         raise typer.Exit()
 
+def huggingface_options(low_cpu_mem_usage, precision, quantize, threads):
+    if precision is not None and precision not in PRECISIONS:
+        raise typer.BadParameter(f"Precision must be one of {', '.join(PRECISIONS)}", param_hint="--precision")
+    options = {'low_cpu_mem_usage': low_cpu_mem_usage, 'precision': precision, 'quantize': quantize, 'threads': threads}
+    return {key: value for key, value in options.items() if value is not None}
+
 if not os.path.exists(KRS_DATA_DIRECTORY):
     os.mkdir(KRS_DATA_DIRECTORY)
 
@@ -24,39 +34,44 @@ def init(kubeconfig: str = typer.Option('~/.kube/config', help="Custom path for
     typer.echo("Services initialized and scanner loaded.")
 
 @app.command()
-def scan():
+def scan(namespace: List[str] = typer.Option(None, help="Only scan this namespace, can be repeated"),
+         exclude_namespace: List[str] = typer.Option(None, help="Skip this namespace, can be repeated"),
+         selector: str = typer.Option(None, help="Label selector to filter pods and deployments, e.g. 'app=nginx'"),
+         field_selector: str = typer.Option(None, help="Field selector to filter pods, e.g. 'status.phase!=Running'")):
     """
     Scans the cluster and extracts a list of tools that are currently used.
     """
     check_initialized()
-    krs.scan_cluster()
+    if not krs.scan_cluster(namespace, exclude_namespace, selector, field_selector):
+        raise typer.Exit(code=1)
 
 
 @app.command()
-def namespaces():
+def namespaces(max_age: int = typer.Option(SCAN_CACHE_TTL_SECONDS, help="Serve the answer from the last scan if it is not older than this many seconds")):
     """
     Lists all the namespaces.
     """
     check_initialized()
-    namespaces = krs.list_namespaces()
+    namespaces = krs.list_namespaces(max_age)
     typer.echo("Namespaces in your cluster are: \n")
     for i, namespace in enumerate(namespaces):
         typer.echo(str(i+1)+ ". "+ namespace)
 
 @app.command()
-def pods(namespace: str = typer.Option(None, help="Specify namespace to list pods from")):
+def pods(namespace: str = typer.Option(None, help="Specify namespace to list pods from"),
+         max_age: int = typer.Option(SCAN_CACHE_TTL_SECONDS, help="Serve the answer from the last scan if it is not older than this many seconds")):
     """
     Lists all the pods with namespaces, or lists pods under a specified namespace.
     """
     check_initialized()
     if namespace:
-        pods = krs.list_pods(namespace)
+        pods = krs.list_pods(namespace, max_age)
         if pods == 'wrong namespace name':
             typer.echo(f"\nWrong namespace name entered, try again!\n")
             raise typer.Abort()
         typer.echo(f"\nPods in namespace '{namespace}': \n")
     else:
-        pods = krs.list_pods_all()
+        pods = krs.list_pods_all(max_age)
         typer.echo("\nAll pods in the cluster: \n")
     
     for i, pod in enumerate(pods):
@@ -70,23 +85,113 @@ def recommend():
     check_initialized()
     krs.generate_recommendations()
 
+@app.command()
+def triage(namespace: str = typer.Option(None, help="Only rank pods in this namespace"),
+           exclude_namespace: List[str] = typer.Option(None, help="Skip this namespace, can be repeated"),
+           selector: str = typer.Option(None, help="Label selector to filter pods, e.g. 'app=nginx'"),
+           field_selector: str = typer.Option(None, help="Field selector to filter pods"),
+           top: int = typer.Option(20, help="Number of pods to show"),
+           include_healthy: bool = typer.Option(False, "--all", help="Also show healthy pods")):
+    """
+    Ranks pods by health using their statuses and Warning events, so you know which pods are worth analyzing.
+    """
+    check_initialized()
+    krs.print_triage(krs.triage_pods(namespace, exclude_namespace, selector, field_selector, top, include_healthy))
+
 @app.command()
 def health(change_model: bool = typer.Option(False, help="Option to reinitialize/change the LLM, if set to True"),
-           device: str = typer.Option('cpu', help='Option to run Huggingface models on GPU by entering the option as "gpu"')):
+           device: str = typer.Option('cpu', help='Option to run Huggingface models on GPU by entering the option as "gpu"'),
+           triage: int = typer.Option(None, help="Pick from the N least healthy pods instead of browsing namespaces"),
+           resume: str = typer.Option(None, help="Resume the latest chat session about a pod, given as namespace/pod"),
+           low_cpu_mem_usage: Optional[bool] = typer.Option(None, "--low-cpu-mem-usage/--no-low-cpu-mem-usage", help="Load Huggingface weights without allocating a second copy in memory"),
+           precision: str = typer.Option(None, help=f"Precision of Huggingface model weights, one of {', '.join(PRECISIONS)}"),
+           quantize: Optional[bool] = typer.Option(None, "--quantize/--no-quantize", help="Apply dynamic int8 quantization to Huggingface models on CPU and cache the quantized copy"),
+           threads: int = typer.Option(None, help="Number of CPU threads used by Huggingface models")):
     """
     Starts an interactive terminal using an LLM of your choice to detect and fix issues with your cluster
     """
     check_initialized()
     typer.echo("\nStarting interactive terminal...\n")
-    krs.health_check(change_model, device)
+    krs.health_check(change_model, device, triage, resume, huggingface_options(low_cpu_mem_usage, precision, quantize, threads))
+
+@app.command()
+def analyze(all_namespaces: bool = typer.Option(False, "--all", help="Analyze the logs of every pod in the cluster"),
+            namespace: str = typer.Option(None, help="Analyze the logs of every pod in this namespace"),
+            exclude_namespace: List[str] = typer.Option(None, help="Skip this namespace, can be repeated"),
+            selector: str = typer.Option(None, help="Label selector to filter pods, e.g. 'app=nginx'"),
+            field_selector: str = typer.Option(None, help="Field selector to filter pods"),
+            workers: int = typer.Option(None, help="Number of worker processes, defaults to the available cores"),
+            fetch_workers: int = typer.Option(None, help="Number of concurrent log downloads, defaults to the number of workers"),
+            tail_lines: int = typer.Option(None, help="Only analyze this many of the latest log lines per container"),
+            ndjson: bool = typer.Option(False, help="Print results as newline delimited JSON"),
+            per_pod: bool = typer.Option(False, help="Analyze every pod instead of one replica per workload and status")):
+    """
+    Extracts warnings and errors from the logs of many pods in parallel, without an LLM.
+    Replicas of a workload are analyzed once unless their status differs.
+    """
+    check_initialized()
+    if not all_namespaces and not namespace:
+        typer.echo("\nSpecify either --all or --namespace.\n")
+        raise typer.Abort()
+    krs.analyze_logs(namespace, exclude_namespace, selector, field_selector, workers, tail_lines, ndjson, per_pod, fetch_workers)
+
+@app.command()
+def watch(namespace: str = typer.Option(None, help="Only watch pods in this namespace"),
+          exclude_namespace: List[str] = typer.Option(None, help="Skip this namespace, can be repeated"),
+          selector: str = typer.Option(None, help="Label selector to filter pods, e.g. 'app=nginx'"),
+          field_selector: str = typer.Option(None, help="Field selector to filter pods"),
+          llm: bool = typer.Option(False, help="Ask the configured LLM to diagnose every finding"),
+          ndjson: bool = typer.Option(False, help="Print findings as newline delimited JSON"),
+          debounce: int = typer.Option(WATCH_DEBOUNCE_SECONDS, help="Seconds to wait for a failing pod to settle before analyzing it"),
+          cooldown: int = typer.Option(WATCH_COOLDOWN_SECONDS, help="Minimum seconds before a workload failing for the same reasons is analyzed again"),
+          tail_lines: int = typer.Option(WATCH_LOG_TAIL_LINES, help="Number of log lines fetched per failing container"),
+          report_existing: bool = typer.Option(False, help="Also analyze pods that are already unhealthy when the watch starts"),
+          device: str = typer.Option('cpu', help='Option to run Huggingface models on GPU by entering the option as "gpu"'),
+          low_cpu_mem_usage: Optional[bool] = typer.Option(None, "--low-cpu-mem-usage/--no-low-cpu-mem-usage", help="Load Huggingface weights without allocating a second copy in memory"),
+          precision: str = typer.Option(None, help=f"Precision of Huggingface model weights, one of {', '.join(PRECISIONS)}"),
+          quantize: Optional[bool] = typer.Option(None, "--quantize/--no-quantize", help="Apply dynamic int8 quantization to Huggingface models on CPU and cache the quantized copy"),
+          threads: int = typer.Option(None, help="Number of CPU threads used by Huggingface models")):
+    """
+    Watches the cluster continuously and analyzes pods as soon as they turn unhealthy.
+    """
+    check_initialized()
+    krs.watch_pods(namespace, exclude_namespace, selector, field_selector, llm, ndjson, debounce, cooldown, tail_lines, device,
+                   huggingface_options(low_cpu_mem_usage, precision, quantize, threads), report_existing)
+
+@app.command()
+def benchmark(model: str = typer.Argument(..., help="Huggingface model name"),
+              threads: int = typer.Option(None, help="Number of CPU threads used for inference"),
+              max_new_tokens: int = typer.Option(32, help="Number of tokens generated per run")):
+    """
+    Benchmarks load time, peak memory and tokens/sec of a Huggingface model for every CPU load option.
+    """
+    krs.benchmark_huggingface(model, threads, max_new_tokens)
+
+@app.command()
+def server(host: str = typer.Option(SERVER_HOST, help="Address to listen on"),
+           port: int = typer.Option(SERVER_PORT, help="Port to listen on"),
+           refresh: int = typer.Option(SERVER_REFRESH_SECONDS, help="Seconds between two scans of the cluster"),
+           namespace: List[str] = typer.Option(None, help="Only scan this namespace, can be repeated"),
+           exclude_namespace: List[str] = typer.Option(None, help="Skip this namespace, can be repeated"),
+           selector: str = typer.Option(None, help="Label selector to filter pods and deployments, e.g. 'app=nginx'"),
+           field_selector: str = typer.Option(None, help="Field selector to filter pods, e.g. 'status.phase!=Running'")):
+    """
+    Serves scan, pods, namespaces, recommend, export and log analysis results as JSON from a shared, periodically refreshed cache.
+    """
+    check_initialized()
+    krs.serve(host, port, refresh, namespace, exclude_namespace, selector, field_selector)
 
 @app.command()
-def export():
+def export(namespace: List[str] = typer.Option(None, help="Only export pods from this namespace, can be repeated"),
+           exclude_namespace: List[str] = typer.Option(None, help="Skip this namespace, can be repeated"),
+           selector: str = typer.Option(None, help="Label selector to filter pods, e.g. 'app=nginx'"),
+           field_selector: str = typer.Option(None, help="Field selector to filter pods, e.g. 'status.phase!=Running'")):
     """
     Exports pod info with logs and events.
     """
     check_initialized()
-    krs.export_pod_info()
+    if not krs.export_pod_info(namespace, exclude_namespace, selector, field_selector):
+        raise typer.Exit(code=1)
     typer.echo("Pod info with logs and events exported. Json file saved to current directory!")
 
 @app.command()
@@ -1,22 +1,41 @@
-from krs.utils.fetch_tools_krs import krs_tool_ranking_info
-from krs.utils.cluster_scanner import KubetoolsScanner
+from krs.utils.fetch_tools_krs import krs_tool_ranking_info, load_recommendation_index
+from krs.utils.cluster_scanner import KubetoolsScanner, ScanError, merge_field_selectors
 from krs.utils.llm_client import KrsGPTClient
+from krs.utils.pod_watcher import PodWatcher
+from krs.utils.triage import rank_pods
+from krs.utils.log_analyzer import LogAnalyzer
+from krs.utils.diagnosis_index import DiagnosisIndex
+from krs.utils.hf_loader import benchmark_huggingface_model
+from krs.utils.krs_server import KrsServerCache, serve
 from krs.utils.functional import extract_log_entries, CustomJSONEncoder
-import os, pickle, time, json
+import os, pickle, time, json, sys, shutil, logging
+from contextlib import redirect_stdout
+from kubernetes.client.rest import ApiException
 from tabulate import tabulate
-from krs.utils.constants import (KRSSTATE_PICKLE_FILEPATH, LLMSTATE_PICKLE_FILEPATH, POD_INFO_FILEPATH, KRS_DATA_DIRECTORY)
+from krs.utils.constants import (KRSSTATE_PICKLE_FILEPATH, PODSTATE_PICKLE_FILEPATH, LLMSTATE_PICKLE_FILEPATH, POD_INFO_FILEPATH, KRS_DATA_DIRECTORY,
+                                 WATCH_DEBOUNCE_SECONDS, WATCH_COOLDOWN_SECONDS, WATCH_LOG_TAIL_LINES, SCAN_CACHE_TTL_SECONDS,
+                                 SERVER_HOST, SERVER_PORT, SERVER_REFRESH_SECONDS)
 
 class KrsMain:
     
     def __init__(self):
 
-        self.pod_info = None
+        self._pod_info = None
+        self.pod_info_loaded = False
+        self.pod_info_changed = False
         self.pod_list = None
+        self.pod_names = None
         self.namespaces = None
+        self.namespace_set = set()
         self.deployments = None
+        self.scanned_at = None
+        self.scan_scoped = False
         self.state_file = KRSSTATE_PICKLE_FILEPATH
+        self.pod_state_file = PODSTATE_PICKLE_FILEPATH
         self.isClusterScanned = False
         self.continue_chat = False
+        self.selected_namespace = None
+        self.selected_pod = None
         self.logs_extracted = []
         self.scanner = None
         self.get_events = True
@@ -27,6 +46,22 @@ class KrsMain:
 
         self.load_state()
 
+    @property
+    def pod_info(self):
+        # Pod info with logs and events is by far the largest part of the state, only read it when needed
+        if not self.pod_info_loaded:
+            self.pod_info_loaded = True
+            if os.path.exists(self.pod_state_file):
+                with open(self.pod_state_file, 'rb') as f:
+                    self._pod_info = pickle.load(f)
+        return self._pod_info
+
+    @pod_info.setter
+    def pod_info(self, pod_info):
+        self._pod_info = pod_info
+        self.pod_info_loaded = True
+        self.pod_info_changed = True
+
     def initialize(self, config_file='~/.kube/config'):
         self.config_file = config_file
         self.tools_dict, self.category_dict, cncf_status_dict = krs_tool_ranking_info()
@@ -36,8 +71,8 @@ class KrsMain:
 
     def save_state(self):
         state = {
-            'pod_info': self.pod_info,
             'pod_list': self.pod_list,
+            'pod_names': self.pod_names,
             'namespaces': self.namespaces,
             'deployments': self.deployments,
             'cncf_status': self.cncf_status,
@@ -46,6 +81,8 @@ class KrsMain:
             'extracted_logs': self.logs_extracted,
             'kubeconfig': self.config_file,
             'isScanned': self.isClusterScanned,
+            'scanned_at': self.scanned_at,
+            'scan_scoped': self.scan_scoped,
             'cluster_tool_list': self.cluster_tool_list,
             'detailed_tool_list': self.detailed_cluster_tool_list,
             'category_tool_list': self.category_cluster_tools_dict
@@ -53,13 +90,20 @@ class KrsMain:
         os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
         with open(self.state_file, 'wb') as f:
             pickle.dump(state, f)
+        if self.pod_info_changed:
+            with open(self.pod_state_file, 'wb') as f:
+                pickle.dump(self._pod_info, f)
+            self.pod_info_changed = False
 
     def load_state(self):
         if os.path.exists(self.state_file):
             with open(self.state_file, 'rb') as f:
                 state = pickle.load(f)
-                self.pod_info = state.get('pod_info')
+                if 'pod_info' in state:
+                    # State saved before pod info was moved to its own file
+                    self.pod_info = state['pod_info']
                 self.pod_list = state.get('pod_list')
+                self.pod_names = state.get('pod_names')
                 self.namespaces = state.get('namespaces')
                 self.deployments = state.get('deployments')
                 self.cncf_status = state.get('cncf_status')
@@ -68,38 +112,72 @@ class KrsMain:
                 self.logs_extracted = state.get('extracted_logs')
                 self.config_file = state.get('kubeconfig')
                 self.isClusterScanned = state.get('isScanned')
+                self.scanned_at = state.get('scanned_at')
+                self.scan_scoped = state.get('scan_scoped', False)
+                self.namespace_set = set(self.namespaces or [])
                 self.cluster_tool_list = state.get('cluster_tool_list')
                 self.detailed_cluster_tool_list = state.get('detailed_tool_list')
                 self.category_cluster_tools_dict = state.get('category_tool_list')
             self.scanner = KubetoolsScanner(self.get_events, self.get_logs, self.config_file)
     
     def check_scanned(self):
-        if not self.isClusterScanned:
-            self.pod_list, self.pod_info, self.deployments, self.namespaces = self.scanner.scan_kubernetes_deployment()
+        """
+        Scans the cluster if no scan is saved yet. Returns False if the scan failed.
+        """
+        if not self.isClusterScanned or self.pod_info is None:
+            try:
+                self.pod_list, self.pod_info, self.deployments, self.namespaces = self.scanner.scan_kubernetes_deployment()
+            except ScanError as e:
+                print(f"\nCould not scan the cluster: {e}\n")
+                return False
+            self.mark_scanned()
             self.save_state()
-
-    def list_namespaces(self):
-        self.check_scanned()
+        return True
+
+    def mark_scanned(self, scoped=False):
+        self.scanned_at = time.time()
+        self.scan_scoped = scoped
+        self.namespace_set = set(self.namespaces or [])
+        self.pod_names = {namespace: [pod['name'] for pod in pods] for namespace, pods in self.pod_info.items()}
+
+    def is_cache_fresh(self, max_age=SCAN_CACHE_TTL_SECONDS):
+        """
+        Checks whether the saved scan covers the whole cluster and is younger than max_age seconds.
+        A max_age of None accepts a scan of any age.
+        """
+        if self.pod_names is None or self.scanned_at is None or self.scan_scoped:
+            return False
+        return max_age is None or time.time() - self.scanned_at <= max_age
+
+    def list_namespaces(self, max_age=SCAN_CACHE_TTL_SECONDS):
+        if self.is_cache_fresh(max_age):
+            return list(self.namespaces)
         return self.scanner.list_namespaces()
     
-    def list_pods(self, namespace):
-        self.check_scanned()
-        if namespace not in self.list_namespaces():
+    def list_pods(self, namespace, max_age=SCAN_CACHE_TTL_SECONDS):
+        if self.is_cache_fresh(max_age):
+            if namespace not in self.namespace_set:
+                return "wrong namespace name"
+            return list(self.pod_names.get(namespace, []))
+        if not self.scanner.namespace_exists(namespace):
             return "wrong namespace name"
         return self.scanner.list_pods(namespace)
     
-    def list_pods_all(self):
-        self.check_scanned()
+    def list_pods_all(self, max_age=SCAN_CACHE_TTL_SECONDS):
+        if self.is_cache_fresh(max_age):
+            return list(self.pod_list)
         return self.scanner.list_pods_all()
     
-    def detect_tools_from_repo(self):
+    def detect_tools_from_repo(self, pod_list=None, deployments=None):
+        pod_list = self.pod_list if pod_list is None else pod_list
+        deployments = self.deployments if deployments is None else deployments
         tool_set = set()
-        for pod in self.pod_list:
+        for pod in pod_list:
             for service_name in pod.split('-'):
                 if service_name in self.tools_dict.keys():
                     tool_set.add(service_name)
         
-        for dep in self.deployments:
+        for dep in deployments:
             for service_name in dep.split('-'):
                 if service_name in self.tools_dict.keys():
                     tool_set.add(service_name)
@@ -124,23 +202,55 @@ class KrsMain:
     
     def generate_recommendations(self):
 
-        if not self.isClusterScanned:
-            self.scan_cluster()
+        if self.cluster_tool_list is None:
+            # Tool detection only needs object names, so skip the full scan with logs and events
+            print("\nDetecting tools used in your cluster...\n")
+            self.cluster_tool_list = self.detect_tools_from_repo(self.scanner.list_pods_all(), self.scanner.list_deployments())
+            self.save_state()
 
         self.print_recommendations()
+
+    def recommend_tools(self, tool_list, index):
+        """
+        Recommends the top ranked tool of every category the given tools belong to.
+
+        Returns:
+            list: Rows of category, recommendation, recommended tool and its CNCF status.
+        """
+        best_ranks = {}
+        for tool in tool_list:
+            for category, rank in index['tool_categories'].get(tool, []):
+                best_ranks[category] = min(rank, best_ranks.get(category, rank))
+
+        recommendations = []
+        for category, rank in best_ranks.items():
+            recommended_tool = index['categories'][category][0]
+            status = index['cncf_status'].get(recommended_tool, 'unlisted')
+            recommendation = "Already using the best" if rank == 1 else "Recommended tool"
+            recommendations.append([category, recommendation, recommended_tool, status])
+        return recommendations
     
-    def scan_cluster(self):
+    def scan_cluster(self, namespaces=None, exclude_namespaces=None, label_selector=None, field_selector=None):
 
         print("\nScanning your cluster...\n")
-        self.pod_list, self.pod_info, self.deployments, self.namespaces = self.scanner.scan_kubernetes_deployment()
+        try:
+            self.pod_list, self.pod_info, self.deployments, self.namespaces = self.scanner.scan_kubernetes_deployment(
+                namespaces, exclude_namespaces, label_selector, field_selector)
+        except ScanError as e:
+            # The previous scan is kept, a failed scan is never saved
+            print(f"Could not scan the cluster: {e}\n")
+            return False
         self.isClusterScanned = True
+        self.mark_scanned(scoped=bool(namespaces or exclude_namespaces or label_selector or field_selector))
         print("Cluster scanned successfully...\n")
+        # Pods of StatefulSets, DaemonSets and Jobs carry their owner's name, so the pod names cover those tools
         self.cluster_tool_list = self.detect_tools_from_repo()
         print("Extracted tools used in cluster...\n")
         self.detailed_cluster_tool_list, self.category_cluster_tools_dict = self.extract_rankings()
 
         self.print_scan_results()
         self.save_state()
+        return True
 
     def print_scan_results(self):
         scan_results = []
@@ -156,25 +266,37 @@ class KrsMain:
         print(tabulate(scan_results, headers=["Tool Name", "Rank", "Category", "CNCF Status"], tablefmt="grid"))
 
     def print_recommendations(self):
-        recommendations = []
-
-        for category, ranks in self.category_cluster_tools_dict.items():
-            rank = ranks[0]
-            recommended_tool = self.category_dict[category][1]['name']
-            status = self.cncf_status.get(recommended_tool, 'unlisted')
-            if rank == 1:
-                row = [category, "Already using the best", recommended_tool, status]
-            else:
-                row = [category, "Recommended tool", recommended_tool, status]
-            recommendations.append(row)
+        index = load_recommendation_index()
+        if index is None:
+            print("\nRecommendation data is missing. Please run 'krs init' again.")
+            return
+        recommendations = self.recommend_tools(self.cluster_tool_list, index)
 
         print("\nOur recommended tools for this deployment are:\n")
         print(tabulate(recommendations, headers=["Category", "Recommendation", "Tool Name", "CNCF Status"], tablefmt="grid"))
 
     
-    def health_check(self, change_model=False, device='cpu'):
+    def health_check(self, change_model=False, device='cpu', triage_top=None, resume_pod=None, hf_options=None):
+
+        # The client for a new pod is only created once we know the LLM is needed
+        krsllmclient = None
+        self.continue_chat = False
 
-        if os.path.exists(LLMSTATE_PICKLE_FILEPATH) and not change_model:
+        if resume_pod:
+            if change_model:
+                print("\n--resume cannot be combined with --change-model, the session was held with the current model.\n")
+                return
+            if not os.path.exists(LLMSTATE_PICKLE_FILEPATH):
+                print("\nNo LLM has been configured yet, run 'krs health' first to start a chat session.\n")
+                return
+            namespace, _, pod = resume_pod.partition('/')
+            krsllmclient = KrsGPTClient(reset_history=True, device=device, hf_options=hf_options)
+            if not krsllmclient.resume_session(namespace, pod):
+                print(f"\nNo previous chat session found for pod {resume_pod}.\n")
+                return
+            self.continue_chat = True
+
+        elif os.path.exists(LLMSTATE_PICKLE_FILEPATH) and not change_model:
             continue_previous_chat = input("\nDo you want to continue fixing the previously selected pod ? (y/n): >> ")
             while True:
                 if continue_previous_chat not in ['y', 'n']:
@@ -183,21 +305,22 @@ class KrsMain:
                     break
 
             if continue_previous_chat=='y':
-                krsllmclient = KrsGPTClient(device=device)
-                self.continue_chat = True
-            else:
-                krsllmclient = KrsGPTClient(reset_history=True, device=device)
-            
-        else:
-            krsllmclient = KrsGPTClient(reinitialize=True, device=device)
-            self.continue_chat = False
+                krsllmclient = KrsGPTClient(device=device, hf_options=hf_options)
+                self.continue_chat = bool(krsllmclient.history)
 
-        if not self.continue_chat:
+        if not self.continue_chat and triage_top:
 
-            self.check_scanned()
+            self.logs_extracted = self.extract_logs_from_triage(triage_top)
+            if self.selected_pod is None:
+                return
+
+        elif not self.continue_chat:
+
+            if not self.check_scanned():
+                return
 
             print("\nNamespaces in the cluster:\n")
-            namespaces = self.list_namespaces()
+            namespaces = list(self.namespaces)
             namespace_len = len(namespaces)
             for i, namespace in enumerate(namespaces, start=1):
                 print(f"{i}. {namespace}")
@@ -210,7 +333,8 @@ class KrsMain:
                     break
 
             self.selected_namespace = namespaces[self.selected_namespace_index - 1]
-            pod_list = self.list_pods(self.selected_namespace)
+            pod_list = [pod['name'] for pod in self.pod_info[self.selected_namespace]]
+            self.selected_pod = None
             pod_len = len(pod_list)
             print(f"\nPods in the namespace {self.selected_namespace}:\n")
             for i, pod in enumerate(pod_list, start=1):
@@ -223,6 +347,8 @@ class KrsMain:
                 else:
                     break
 
+            self.selected_pod = pod_list[self.selected_pod_index - 1]
+
             print("\nChecking status of the pod...")
 
             print("\nExtracting logs and events from the pod...")
@@ -233,17 +359,97 @@ class KrsMain:
 
             print("\nLogs and events from the pod extracted successfully!\n")
 
+        if not self.continue_chat:
+            if self.answer_from_diagnosis_index(self.logs_extracted):
+                self.save_state()
+                return
+            if krsllmclient is None:
+                reinitialize = change_model or not os.path.exists(LLMSTATE_PICKLE_FILEPATH)
+                krsllmclient = KrsGPTClient(reinitialize=reinitialize, reset_history=True, device=device, hf_options=hf_options)
+            krsllmclient.start_session(self.selected_namespace, self.selected_pod)
+
         prompt_to_llm = self.create_prompt(self.logs_extracted)
 
         krsllmclient.interactive_session(prompt_to_llm)
 
+        if not self.continue_chat and len(krsllmclient.history) > 1:
+            DiagnosisIndex().add(self.logs_extracted, krsllmclient.history[1]['content'], self.selected_namespace, self.selected_pod)
+
         self.save_state()
 
+    def answer_from_diagnosis_index(self, log_entries):
+        """
+        Shows a stored diagnosis of similar log entries, if any. Returns True if the user does not need the LLM.
+        """
+        record, score = DiagnosisIndex().search(log_entries)
+        if record is None:
+            return False
+
+        print(f"\nThese log entries match a known failure (similarity {score:.2f}), diagnosed for pod {record['namespace']}/{record['pod']}:\n")
+        print(">> ", record['diagnosis'])
+        ask_llm = input("\nDo you still want to ask the LLM? (y/n): >> ")
+        while ask_llm not in ['y', 'n']:
+            ask_llm = input("\nPlease enter one of the given options ? (y/n): >> ")
+        return ask_llm == 'n'
+
+    def extract_logs_from_triage(self, top):
+        """
+        Lets the user pick one of the least healthy pods and extracts its logs, skipping the full cluster scan.
+        """
+        print("\nRanking pods by health...")
+        ranked = self.triage_pods(top=top)
+        self.selected_pod = None
+        if not ranked:
+            print("\nNo unhealthy pods found in the cluster!\n")
+            return set()
+
+        print("\nLeast healthy pods in the cluster:\n")
+        for i, pod in enumerate(ranked, start=1):
+            print(f"{i}. {pod['namespace']}/{pod['pod']} (score: {pod['score']}) {', '.join(pod['reasons'])}")
+
+        pod_len = len(ranked)
+        self.selected_pod_index = int(input("\nWhich pod do you want to check the health for? Select a pod by entering its number: >> "))
+        while True:
+            if self.selected_pod_index not in list(range(1, pod_len+1)):
+                self.selected_pod_index = int(input(f"\nWrong input! Select a pod number between {1} to {pod_len}: >> "))
+            else:
+                break
+
+        selected = ranked[self.selected_pod_index - 1]
+        self.selected_namespace = selected['namespace']
+        self.selected_pod = selected['pod']
+
+        print("\nExtracting logs from the pod...")
+        pod_info = self.scanner.get_pod_info(selected['namespace'], selected['pod'], include_events=False)
+        logs_extracted = extract_log_entries('\n'.join(pod_info['Logs'].values()))
+        print("\nLogs from the pod extracted successfully!\n")
+        return logs_extracted
+
+    def triage_pods(self, namespace=None, exclude_namespaces=None, label_selector=None, field_selector=None, top=None,
+                    include_healthy=False):
+        """
+        Ranks pods by a health score computed from their statuses and Warning events, without fetching any logs.
+        """
+        pods = self.scanner.list_pod_objects(namespace, label_selector,
+                                             merge_field_selectors(field_selector, None if namespace else exclude_namespaces))
+        warning_counts = self.scanner.count_warning_events(namespace)
+        return rank_pods(pods, warning_counts, top, include_healthy)
+
+    def print_triage(self, ranked):
+        if not ranked:
+            print("\nNo unhealthy pods found in the cluster!\n")
+            return
+
+        rows = [[i, pod['namespace'], pod['pod'], pod['score'], pod['phase'], 'yes' if pod['ready'] else 'no',
+                 pod['restarts'], pod['warnings'], '\n'.join(pod['reasons'])] for i, pod in enumerate(ranked, start=1)]
+        print("\nPods ranked by health, least healthy first:\n")
+        print(tabulate(rows, headers=["Rank", "Namespace", "Pod", "Score", "Phase", "Ready", "Restarts", "Warnings", "Reasons"], tablefmt="grid"))
+
     def get_logs_from_pod(self, namespace_index, pod_index):
         try:
             namespace_index -= 1
             pod_index -= 1
-            namespace = list(self.list_namespaces())[namespace_index]
+            namespace = self.namespaces[namespace_index]
             return list(self.pod_info[namespace][pod_index]['info']['Logs'].values())[0]
         except KeyError as e:
             print("\nKindly enter a value from the available namespaces and pods")
@@ -256,12 +462,167 @@ class KrsMain:
         prompt += "}\nIf there is nothing of concern in between { }, return a message stating that 'Everything looks good!'. Explain the warnings and errors and the steps that should be taken to resolve the issues, only if they exist."
         return prompt
     
-    def export_pod_info(self):
+    def watch_pods(self, namespace=None, exclude_namespaces=None, label_selector=None, field_selector=None, use_llm=False,
+                   ndjson=False, debounce=WATCH_DEBOUNCE_SECONDS, cooldown=WATCH_COOLDOWN_SECONDS,
+                   tail_lines=WATCH_LOG_TAIL_LINES, device='cpu', hf_options=None, report_existing=False):
 
-        self.check_scanned()
+        krsllmclient = None
+        diagnosis_index = DiagnosisIndex()
+        if use_llm:
+            # Keep stdout clean for NDJSON consumers while the LLM state is loaded
+            with redirect_stdout(sys.stderr):
+                krsllmclient = KrsGPTClient(reset_history=True, device=device, hf_options=hf_options)
+
+        watcher = PodWatcher(self.scanner.v2, namespace, exclude_namespaces, label_selector, field_selector,
+                             debounce, cooldown, tail_lines, report_existing, self.scanner.list_workload_owners)
+
+        if not ndjson:
+            print("\nWatching pods for failures. Press Ctrl+C to stop...\n")
+
+        try:
+            for finding in watcher.watch():
+                if krsllmclient:
+                    record, score = diagnosis_index.search(finding['log_entries'])
+                    if record:
+                        finding['diagnosis'] = record['diagnosis']
+                        finding['similarity'] = round(score, 3)
+                    else:
+                        # Findings are diagnosed in one-off sessions that do not evict the stored health chats
+                        krsllmclient.start_session(finding['namespace'], finding['pod'], persist=False)
+                        finding['diagnosis'] = krsllmclient.infer(self.create_prompt(finding['log_entries']), echo=False)
+                        diagnosis_index.add(finding['log_entries'], finding['diagnosis'], finding['namespace'], finding['pod'])
+                self.print_finding(finding, ndjson)
+        except KeyboardInterrupt:
+            pass
+
+    def print_finding(self, finding, ndjson=False):
+        if ndjson:
+            print(json.dumps(finding, cls=CustomJSONEncoder), flush=True)
+            return
+
+        print(f"[{finding['timestamp']}] {finding['namespace']}/{finding['pod']} (restarts: {finding['restarts']})")
+        print(f"  Workload: {finding['workload']}")
+        for reason in finding['reasons']:
+            print(f"  Reason: {reason}")
+        for entry in finding['log_entries']:
+            print(f"  - {entry}")
+        if finding.get('similarity'):
+            print(f"\n  Known failure (similarity {finding['similarity']:.2f})")
+        if finding.get('diagnosis'):
+            print(f"\n  Diagnosis: {finding['diagnosis']}")
+        print(flush=True)
+
+    def analyze_logs(self, namespace=None, exclude_namespaces=None, label_selector=None, field_selector=None,
+                     workers=None, tail_lines=None, ndjson=False, per_pod=False, fetch_workers=None):
+
+        pods = self.scanner.list_pod_objects(namespace, label_selector,
+                                             merge_field_selectors(field_selector, None if namespace else exclude_namespaces))
+        analyzer = LogAnalyzer(self.scanner, workers, tail_lines, fetch_workers)
+
+        if not per_pod:
+            self.analyze_workload_logs(analyzer, pods, namespace, ndjson)
+            return
+
+        if not ndjson:
+            print(f"\nAnalyzing logs of {len(pods)} pods with {analyzer.workers} workers...\n")
+
+        pods_with_findings = 0
+        for result in analyzer.analyze(pods):
+            if ndjson:
+                print(json.dumps(result), flush=True)
+                continue
+            if result['log_entries']:
+                pods_with_findings += 1
+                print(f"{result['namespace']}/{result['pod']}:")
+                for entry in result['log_entries']:
+                    print(f"  - {entry}")
+                print(flush=True)
+
+        if not ndjson:
+            print(f"Analyzed {len(pods)} pods, {pods_with_findings} with warnings or errors.")
+
+    def analyze_workload_logs(self, analyzer, pods, namespace=None, ndjson=False):
+
+        try:
+            replicaset_owners, job_owners = self.scanner.list_workload_owners([namespace] if namespace else None)
+        except ApiException as e:
+            # Without access to ReplicaSets or Jobs, pods are grouped by their direct controller
+            logging.warning("Could not list ReplicaSet and Job owners, grouping pods by their direct controller: %s", e)
+            replicaset_owners, job_owners = {}, {}
+
+        if not ndjson:
+            print(f"\nAnalyzing logs of {len(pods)} pods by workload with {analyzer.workers} workers...\n")
+
+        workload_count = analyzed_count = workloads_with_findings = 0
+        for report in analyzer.analyze_workloads(pods, replicaset_owners, job_owners):
+            workload_count += 1
+            analyzed_count += len(report['groups'])
+            if ndjson:
+                print(json.dumps(report), flush=True)
+                continue
+            if not any(group['log_entries'] for group in report['groups']):
+                continue
+
+            workloads_with_findings += 1
+            print(f"{report['namespace']}/{report['kind']}/{report['name']} ({report['replicas']} replicas):")
+            printed_fingerprints = {}
+            for group in report['groups']:
+                status = f"{group['status']['phase']}, {'ready' if group['status']['ready'] else 'not ready'}"
+                reasons = f", {', '.join(group['status']['reasons'])}" if group['status']['reasons'] else ""
+                print(f"  {len(group['pods'])} pod(s) like {group['representative']} ({status}{reasons}):")
+                if group['fingerprint'] in printed_fingerprints:
+                    print(f"    Same log findings as {printed_fingerprints[group['fingerprint']]}")
+                    continue
+                printed_fingerprints[group['fingerprint']] = group['representative']
+                for entry in group['log_entries']:
+                    print(f"    - {entry}")
+            print(flush=True)
+
+        if not ndjson:
+            print(f"Analyzed {workload_count} workloads through {analyzed_count} of {len(pods)} pods, {workloads_with_findings} with warnings or errors.")
+
+    def benchmark_huggingface(self, model_name, threads=None, max_new_tokens=32):
+
+        print(f"\nBenchmarking CPU load options for {model_name}, every option runs in a fresh process...\n")
+        rows = []
+        for name, result in benchmark_huggingface_model(model_name, threads=threads, max_new_tokens=max_new_tokens):
+            if 'error' in result:
+                print(f"{name}: failed with {result['error']}")
+                continue
+            rows.append([name, result['load_seconds'], result['peak_memory_mb'], result['tokens_per_second']])
+            print(f"{name}: done")
+
+        print()
+        print(tabulate(rows, headers=["Option", "Load Time (s)", "Peak Memory (MB)", "Tokens/sec"], tablefmt="grid"))
+
+    def serve(self, host=SERVER_HOST, port=SERVER_PORT, refresh_interval=SERVER_REFRESH_SECONDS, namespaces=None,
+              exclude_namespaces=None, label_selector=None, field_selector=None):
+
+        cache = KrsServerCache(self, refresh_interval, namespaces, exclude_namespaces, label_selector, field_selector)
+        print(f"\nServing krs results on http://{host}:{port}, refreshing every {refresh_interval} seconds. Press Ctrl+C to stop...\n")
+        try:
+            serve(cache, host, port)
+        except KeyboardInterrupt:
+            pass
+
+    def export_pod_info(self, namespaces=None, exclude_namespaces=None, label_selector=None, field_selector=None):
+
+        if namespaces or exclude_namespaces or label_selector or field_selector:
+            # Scoped exports are fetched on demand and do not replace the saved scan
+            try:
+                _, pod_info, _, _ = self.scanner.scan_kubernetes_deployment(
+                    namespaces, exclude_namespaces, label_selector, field_selector)
+            except ScanError as e:
+                print(f"\nCould not scan the cluster: {e}\n")
+                return False
+        else:
+            if not self.check_scanned():
+                return False
+            pod_info = self.pod_info
 
         with open(POD_INFO_FILEPATH, 'w') as f:
-            json.dump(self.pod_info, f, cls=CustomJSONEncoder)
+            json.dump(pod_info, f, cls=CustomJSONEncoder)
+        return True
             
 
     def exit(self):
@@ -275,6 +636,9 @@ class KrsMain:
                 if os.path.isfile(file_path):
                     os.remove(file_path)  # Delete the file
                     print(f"Deleted file: {file_path}")
+                elif os.path.isdir(file_path):
+                    shutil.rmtree(file_path)  # Delete directories such as the chat sessions
+                    print(f"Deleted directory: {file_path}")
 
         except Exception as e:
             print(f"Error occurred: {e}")
@@ -0,0 +1,94 @@
+from krs.utils.constants import (CHAT_SESSIONS_DIRECTORY, CHAT_SESSIONS_INDEX_FILENAME, CHAT_SESSION_MAX_MESSAGES,
+                                 CHAT_SESSION_MAX_COUNT)
+from datetime import datetime
+import json, os, uuid
+
+class ChatSessionStore:
+    """
+    Stores every chat session as an append-only JSONL log with one message per line.
+
+    A small index maps session ids to the namespace and pod they are about. It is only rewritten
+    when sessions are created or deleted, so a chat turn costs a single appended line.
+    """
+
+    def __init__(self, directory=CHAT_SESSIONS_DIRECTORY, max_messages=CHAT_SESSION_MAX_MESSAGES,
+                 max_sessions=CHAT_SESSION_MAX_COUNT):
+        self.directory = directory
+        self.index_file = os.path.join(directory, CHAT_SESSIONS_INDEX_FILENAME)
+        self.max_messages = max_messages
+        self.max_sessions = max_sessions
+        os.makedirs(directory, exist_ok=True)
+        self.index = self.load_index()
+
+    def load_index(self):
+        try:
+            with open(self.index_file) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_index(self):
+        temp_file = self.index_file + '.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(temp_file, self.index_file)
+
+    def session_path(self, session_id):
+        return os.path.join(self.directory, f'{session_id}.jsonl')
+
+    def create(self, namespace=None, pod=None):
+        session_id = datetime.now().strftime('%Y%m%d%H%M%S') + '-' + uuid.uuid4().hex[:8]
+        self.index[session_id] = {'namespace': namespace, 'pod': pod, 'created': datetime.now().isoformat()}
+        open(self.session_path(session_id), 'a').close()
+        self.enforce_retention()
+        self.save_index()
+        return session_id
+
+    def append(self, session_id, message):
+        with open(self.session_path(session_id), 'a') as f:
+            f.write(json.dumps({'role': message['role'], 'content': message['content']}) + '\n')
+
+    def load(self, session_id):
+        """
+        Reads the messages of a session, compacting its log first if it grew past the message limit.
+        """
+        try:
+            with open(self.session_path(session_id)) as f:
+                messages = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+        if len(messages) > self.max_messages:
+            messages = self.compact(session_id, messages)
+        return messages
+
+    def compact(self, session_id, messages):
+        # Keep the initial prompt with the extracted logs, it gives the rest of the chat its context
+        messages = messages[:1] + messages[-(self.max_messages - 1):]
+        temp_file = self.session_path(session_id) + '.tmp'
+        with open(temp_file, 'w') as f:
+            f.writelines(json.dumps(message) + '\n' for message in messages)
+        os.replace(temp_file, self.session_path(session_id))
+        return messages
+
+    def last_updated(self, session_id):
+        try:
+            return os.path.getmtime(self.session_path(session_id))
+        except FileNotFoundError:
+            return 0
+
+    def latest(self, namespace=None, pod=None):
+        """
+        Returns the id of the most recently updated session, optionally for a given namespace and pod.
+        """
+        session_ids = [session_id for session_id, info in self.index.items()
+                       if (namespace is None or info['namespace'] == namespace) and (pod is None or info['pod'] == pod)]
+        return max(session_ids, key=self.last_updated, default=None)
+
+    def delete(self, session_id):
+        self.index.pop(session_id, None)
+        if os.path.exists(self.session_path(session_id)):
+            os.remove(self.session_path(session_id))
+
+    def enforce_retention(self):
+        for session_id in sorted(self.index, key=self.last_updated)[:-self.max_sessions or None]:
+            self.delete(session_id)
@@ -1,5 +1,21 @@
 from kubernetes import client, config
-import logging
+from kubernetes.client.rest import ApiException
+from krs.utils.constants import METADATA_ONLY_ACCEPT
+from krs.utils.workloads import controller_of
+from collections import Counter
+import logging, json
+
+class ScanError(Exception):
+    """Raised when the cluster could not be scanned, so no partial or empty scan is used."""
+
+
+def merge_field_selectors(field_selector=None, exclude_namespaces=None):
+    """
+    Adds a metadata.namespace!= requirement for every excluded namespace to a field selector.
+    """
+    selectors = [field_selector] if field_selector else []
+    selectors += [f'metadata.namespace!={name}' for name in sorted(set(exclude_namespaces or []))]
+    return ','.join(selectors) or None
 
 class KubetoolsScanner:
     def __init__(self, get_events=True, get_logs=True, config_file='~/.kube/config'):
@@ -19,35 +35,177 @@ class KubetoolsScanner:
             logging.error("Failed to load Kubernetes configuration: %s", e)
             raise
 
-    def scan_kubernetes_deployment(self):
+    def scan_kubernetes_deployment(self, namespaces=None, exclude_namespaces=None, label_selector=None, field_selector=None):
+        """
+        Scans deployments, namespaces and pods, optionally scoped to a subset of the cluster.
+
+        Args:
+            namespaces (list): Only scan these namespaces. All namespaces are scanned if empty.
+            exclude_namespaces (list): Namespaces to skip.
+            label_selector (str): Label selector applied to pods and deployments, e.g. 'app=nginx,tier!=db'.
+            field_selector (str): Field selector applied to pods, e.g. 'status.phase!=Running'.
+
+        Returns:
+            tuple: The pod list, pod info dictionary keyed by namespace, deployment list and scanned namespaces.
+
+        Raises:
+            ScanError: If a given namespace does not exist or the Kubernetes API could not be reached.
+        """
+        scanned_namespaces = self.resolve_namespaces(namespaces, exclude_namespaces)
+        pod_dict = {}
+        pod_list = []
         try:
-            deployments = self.v1.list_deployment_for_all_namespaces()
-            namespaces = self.list_namespaces()
+            # Excluded namespaces are dropped by the API server, so only an explicit namespace list needs a call per namespace
+            deployments = self.list_deployments(scanned_namespaces if namespaces else None, label_selector=label_selector,
+                                                field_selector=None if namespaces else merge_field_selectors(None, exclude_namespaces))
+            for name in scanned_namespaces:
+                pods = self.list_pods(name, label_selector=label_selector, field_selector=field_selector)
+                pod_list += pods
+                pod_dict[name] = [{'name': pod, 'info': self.get_pod_info(name, pod)} for pod in pods]
         except Exception as e:
             logging.error("Error fetching data from Kubernetes API: %s", e)
-            return {}, {}, []
+            raise ScanError(f"Error fetching data from Kubernetes API: {e}") from e
 
-        pod_dict = {}
-        pod_list = []
-        for name in namespaces:
-            pods = self.list_pods(name)
-            pod_list += pods
-            pod_dict[name] = [{'name': pod, 'info': self.get_pod_info(name, pod)} for pod in pods]
+        return pod_list, pod_dict, deployments, scanned_namespaces
 
-        deployment_list = [dep.metadata.name for dep in deployments.items]
-        return pod_list, pod_dict, deployment_list, namespaces
+    def resolve_namespaces(self, namespaces=None, exclude_namespaces=None):
+        """
+        Resolves the namespaces to scan, letting the API server drop excluded ones.
 
-    def list_namespaces(self):
-        namespaces = self.v2.list_namespace()
-        return [namespace.metadata.name for namespace in namespaces.items]
+        Raises:
+            ScanError: If a given namespace does not exist or the namespaces could not be listed.
+        """
+        exclude_namespaces = set(exclude_namespaces or [])
+        field_selector = ','.join(f'metadata.name!={name}' for name in sorted(exclude_namespaces))
+        try:
+            existing_namespaces = self.list_namespaces(field_selector=None if namespaces else field_selector or None)
+        except Exception as e:
+            logging.error("Error fetching data from Kubernetes API: %s", e)
+            raise ScanError(f"Error fetching data from Kubernetes API: {e}") from e
+
+        if not namespaces:
+            return existing_namespaces
+
+        unknown_namespaces = set(namespaces) - set(existing_namespaces)
+        if unknown_namespaces:
+            raise ScanError(f"Namespace(s) not found in the cluster: {', '.join(sorted(unknown_namespaces))}")
+        return [name for name in dict.fromkeys(namespaces) if name not in exclude_namespaces]
+
+    def list_deployments(self, namespaces=None, label_selector=None, field_selector=None):
+        if namespaces is None:
+            return self.list_object_names('/apis/apps/v1/deployments', label_selector, field_selector)
+        deployment_list = []
+        for namespace in namespaces:
+            deployment_list += self.list_object_names(f'/apis/apps/v1/namespaces/{namespace}/deployments', label_selector, field_selector)
+        return deployment_list
+
+    def list_namespaces(self, field_selector=None):
+        return self.list_object_names('/api/v1/namespaces', field_selector=field_selector)
     
-    def list_pods_all(self):
-        pods = self.v2.list_pod_for_all_namespaces()
-        return [pod.metadata.name for pod in pods.items]
+    def list_pods_all(self, label_selector=None, field_selector=None):
+        return self.list_object_names('/api/v1/pods', label_selector, field_selector)
+
+    def list_pods(self, namespace, label_selector=None, field_selector=None):
+        return self.list_object_names(f'/api/v1/namespaces/{namespace}/pods', label_selector, field_selector)
 
-    def list_pods(self, namespace):
-        pods = self.v2.list_namespaced_pod(namespace)
-        return [pod.metadata.name for pod in pods.items]
+    def namespace_exists(self, namespace):
+        try:
+            self.v2.read_namespace(namespace)
+        except ApiException as e:
+            if e.status == 404:
+                return False
+            raise
+        return True
+
+    def list_object_names(self, path, label_selector=None, field_selector=None):
+        return [metadata['name'] for metadata in self.list_object_metadata(path, label_selector, field_selector)]
+
+    def list_object_metadata(self, path, label_selector=None, field_selector=None):
+        """
+        Lists the metadata of the objects under an API path.
+
+        The API server is asked for a PartialObjectMetadataList, so the object specs and
+        statuses are never transferred.
+        """
+        selectors = self.selector_kwargs(label_selector, field_selector)
+        query_params = [('labelSelector' if key == 'label_selector' else 'fieldSelector', value) for key, value in selectors.items()]
+        response = self.v2.api_client.call_api(path, 'GET', query_params=query_params,
+                                               header_params={'Accept': METADATA_ONLY_ACCEPT},
+                                               auth_settings=['BearerToken'], _return_http_data_only=True,
+                                               _preload_content=False)
+        return [item['metadata'] for item in json.loads(response.data).get('items', [])]
+
+    def list_namespaced_metadata(self, api, resource, namespaces=None, label_selector=None, field_selector=None):
+        """
+        Lists object metadata across all namespaces with one call, or with one call per given namespace.
+        """
+        if namespaces is None:
+            return self.list_object_metadata(f'{api}/{resource}', label_selector, field_selector)
+        metadata = []
+        for namespace in namespaces:
+            metadata += self.list_object_metadata(f'{api}/namespaces/{namespace}/{resource}', label_selector, field_selector)
+        return metadata
+
+    def list_controller_owners(self, api, resource, namespaces=None):
+        """
+        Maps every object of a resource to its controller, e.g. ReplicaSets to their Deployment.
+
+        Returns:
+            dict: (kind, name) of the controller keyed by (namespace, name) of the object.
+        """
+        owners = {}
+        for metadata in self.list_namespaced_metadata(api, resource, namespaces):
+            owner = controller_of(metadata.get('ownerReferences'))
+            if owner:
+                owners[(metadata['namespace'], metadata['name'])] = owner
+        return owners
+
+    def list_workload_owners(self, namespaces=None):
+        """
+        Returns the controllers of ReplicaSets and Jobs, needed to resolve pods to their Deployment or CronJob.
+        """
+        return (self.list_controller_owners('/apis/apps/v1', 'replicasets', namespaces),
+                self.list_controller_owners('/apis/batch/v1', 'jobs', namespaces))
+
+    def list_pod_objects(self, namespace=None, label_selector=None, field_selector=None):
+        """
+        Lists full pods as the dictionaries returned by the API. Deserializing large lists into V1Pod
+        models takes far longer than anything done with them, so the response is only parsed as JSON.
+        """
+        kwargs = self.selector_kwargs(label_selector, field_selector)
+        if namespace:
+            response = self.v2.list_namespaced_pod(namespace, _preload_content=False, **kwargs)
+        else:
+            response = self.v2.list_pod_for_all_namespaces(_preload_content=False, **kwargs)
+        return json.loads(response.data).get('items', [])
+
+    def count_warning_events(self, namespace=None):
+        """
+        Counts the Warning events of every pod with a single list call.
+
+        Returns:
+            Counter: Warning event counts keyed by (namespace, pod name).
+        """
+        kwargs = {'field_selector': 'type=Warning,involvedObject.kind=Pod', '_preload_content': False}
+        if namespace:
+            response = self.v2.list_namespaced_event(namespace, **kwargs)
+        else:
+            response = self.v2.list_event_for_all_namespaces(**kwargs)
+
+        counts = Counter()
+        for event in json.loads(response.data).get('items', []):
+            involved_object = event.get('involvedObject') or {}
+            counts[(involved_object.get('namespace'), involved_object.get('name'))] += event.get('count') or 1
+        return counts
+
+    @staticmethod
+    def selector_kwargs(label_selector=None, field_selector=None):
+        kwargs = {}
+        if label_selector:
+            kwargs['label_selector'] = label_selector
+        if field_selector:
+            kwargs['field_selector'] = field_selector
+        return kwargs
 
     def get_pod_info(self, namespace, pod, include_events=True, include_logs=True):
         """
@@ -72,26 +230,34 @@ class KubetoolsScanner:
             info['Events'] = self.fetch_pod_events(namespace, pod)
         
         if include_logs:
-            # Retrieve logs for all containers within the pod
-            container_logs = {}
-            for container in pod_info.spec.containers:
-                try:
-                    logs = self.v2.read_namespaced_pod_log(name=pod, namespace=namespace, container=container.name)
-                    container_logs[container.name] = logs
-                except Exception as e:
-                    logging.error("Failed to fetch logs for container %s in pod %s: %s", container.name, pod, e)
-                    container_logs[container.name] = "Error fetching logs: " + str(e)
-            info['Logs'] = container_logs
+            info['Logs'] = self.fetch_pod_logs(namespace, pod, [container.name for container in pod_info.spec.containers])
 
         return info
 
+    def fetch_pod_logs(self, namespace, pod, containers, tail_lines=None):
+        """
+        Retrieves the logs of the given containers of a pod.
+
+        Returns:
+            dict: The logs keyed by container name.
+        """
+        kwargs = {'tail_lines': tail_lines} if tail_lines else {}
+        container_logs = {}
+        for container in containers:
+            try:
+                container_logs[container] = self.v2.read_namespaced_pod_log(name=pod, namespace=namespace, container=container, **kwargs)
+            except Exception as e:
+                logging.error("Failed to fetch logs for container %s in pod %s: %s", container, pod, e)
+                container_logs[container] = "Error fetching logs: " + str(e)
+        return container_logs
+
     def fetch_pod_events(self, namespace, pod):
-        events = self.v2.list_namespaced_event(namespace)
+        events = self.v2.list_namespaced_event(namespace, field_selector=f'involvedObject.name={pod}')
         return [{
             'Name': event.metadata.name,
             'Message': event.message,
             'Reason': event.reason
-        } for event in events.items if event.involved_object.name == pod]
+        } for event in events.items]
 
 
 if __name__ == '__main__':
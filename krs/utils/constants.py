@@ -7,12 +7,42 @@ CNCF_TOOLS_JSONPATH = 'krs/data/cncf_tools.json'
 
 TOOLS_RANK_JSONPATH = 'krs/data/tools_rank.json'
 CATEGORY_RANK_JSONPATH = 'krs/data/category_rank.json'
+RECOMMENDATION_INDEX_JSONPATH = 'krs/data/recommendation_index.json'
+RECOMMENDATION_INDEX_VERSION = 1
 
 LLMSTATE_PICKLE_FILEPATH = 'krs/data/llmstate.pkl'
+CHAT_SESSIONS_DIRECTORY = 'krs/data/sessions'
+CHAT_SESSIONS_INDEX_FILENAME = 'index.json'
+CHAT_SESSION_MAX_MESSAGES = 200
+CHAT_SESSION_MAX_COUNT = 50
+
+DIAGNOSIS_INDEX_FILEPATH = 'krs/data/diagnoses.jsonl'
+DIAGNOSIS_MATCH_THRESHOLD = 0.85
+DIAGNOSIS_INDEX_MAX_RECORDS = 1000
 KRSSTATE_PICKLE_FILEPATH = 'krs/data/krsstate.pkl'
+PODSTATE_PICKLE_FILEPATH = 'krs/data/podstate.pkl'
 
 POD_INFO_FILEPATH = './exported_pod_info.json'
 
 MAX_OUTPUT_TOKENS = 512
 
+HF_MODELS_DIRECTORY = 'krs/data/hf_models'
+HF_BENCHMARK_PROMPT = "You are a DevOps expert with experience in Kubernetes. Explain what a CrashLoopBackOff means and how to fix it."
+
 KRS_DATA_DIRECTORY = 'krs/data'
+
+SCAN_CACHE_TTL_SECONDS = 300
+METADATA_ONLY_ACCEPT = 'application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,application/json'
+
+UNHEALTHY_WAITING_REASONS = {'CrashLoopBackOff', 'ImagePullBackOff', 'ErrImagePull', 'CreateContainerConfigError', 'CreateContainerError', 'InvalidImageName', 'RunContainerError'}
+UNHEALTHY_TERMINATED_REASONS = {'OOMKilled', 'Error', 'ContainerCannotRun', 'DeadlineExceeded'}
+
+WATCH_DEBOUNCE_SECONDS = 10
+WATCH_COOLDOWN_SECONDS = 300
+WATCH_LOG_TAIL_LINES = 200
+
+ANALYZE_FETCH_WORKERS = 4
+
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8787
+SERVER_REFRESH_SECONDS = 300
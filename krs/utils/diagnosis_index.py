@@ -0,0 +1,129 @@
+from krs.utils.constants import DIAGNOSIS_INDEX_FILEPATH, DIAGNOSIS_MATCH_THRESHOLD, DIAGNOSIS_INDEX_MAX_RECORDS
+from collections import Counter
+from datetime import datetime
+import json, math, os, re
+
+# Words and standalone numbers of up to three digits, such as exit codes and HTTP statuses. Numbers that are
+# part of a timestamp, address, version or hash are skipped.
+TOKEN_PATTERN = re.compile(r'[a-z_]{2,}|(?<![\w:./-])\d{1,3}(?![\w:./-])')
+
+def tokenize(log_entries):
+    # Ids, addresses and timestamps are dropped so they do not make recurring failures look different
+    return TOKEN_PATTERN.findall(' '.join(log_entries).lower())
+
+def entries_key(log_entries):
+    return '\n'.join(sorted(log_entries))
+
+
+class DiagnosisIndex:
+    """
+    A local, persistent index of past (extracted log entries -> LLM diagnosis) pairs.
+
+    Diagnoses are appended to a JSONL file and searched with TF-IDF vectors and cosine similarity,
+    so failures that were diagnosed before can be answered without an LLM round-trip. Once the file
+    holds twice max_records lines, it is rewritten with only the latest max_records diagnoses.
+    """
+
+    def __init__(self, path=DIAGNOSIS_INDEX_FILEPATH, threshold=DIAGNOSIS_MATCH_THRESHOLD,
+                 max_records=DIAGNOSIS_INDEX_MAX_RECORDS):
+        self.path = path
+        self.threshold = threshold
+        self.max_records = max_records
+        self.lines = 0
+        self.records = self.load()
+        self.idf = None
+        self.vectors = None
+
+    def load(self):
+        records = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        self.lines += 1
+                        record = json.loads(line)
+                        key = entries_key(record['log_entries'])
+                        # Later diagnoses of the same log entries replace earlier ones and count as the most recent
+                        records.pop(key, None)
+                        records[key] = record
+        return records
+
+    def add(self, log_entries, diagnosis, namespace=None, pod=None):
+        if not log_entries or not diagnosis:
+            return
+        record = {
+            'log_entries': sorted(log_entries),
+            'diagnosis': diagnosis,
+            'namespace': namespace,
+            'pod': pod,
+            'created': datetime.now().isoformat()
+        }
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        self.lines += 1
+        key = entries_key(record['log_entries'])
+        self.records.pop(key, None)
+        self.records[key] = record
+        self.vectors = None
+
+        # The slack keeps appends cheap, a full index is only rewritten every max_records diagnoses
+        if self.lines >= 2 * self.max_records:
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrites the index with only the latest diagnosis of every set of log entries, dropping the oldest
+        ones beyond max_records.
+        """
+        for key in list(self.records)[:-self.max_records or None]:
+            del self.records[key]
+        temp_file = self.path + '.tmp'
+        with open(temp_file, 'w') as f:
+            for record in self.records.values():
+                f.write(json.dumps(record) + '\n')
+        os.replace(temp_file, self.path)
+        self.lines = len(self.records)
+        self.vectors = None
+
+    def build(self):
+        documents = [(record, Counter(tokenize(record['log_entries']))) for record in self.records.values()]
+        document_frequency = Counter(term for _, counts in documents for term in counts)
+        total = len(documents)
+        self.idf = {term: math.log((1 + total) / (1 + frequency)) + 1 for term, frequency in document_frequency.items()}
+        self.unseen_idf = math.log(1 + total) + 1
+        self.vectors = [(record, self.vectorize(counts)) for record, counts in documents]
+
+    def vectorize(self, counts):
+        # Terms never seen before keep their weight, so novel log lines lower the similarity
+        vector = {term: count * self.idf.get(term, self.unseen_idf) for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {term: weight / norm for term, weight in vector.items()}
+
+    def search(self, log_entries):
+        """
+        Finds the past diagnosis closest to the given log entries.
+
+        Returns:
+            tuple: The matching record and its similarity score, or (None, 0.0) if nothing is close enough.
+        """
+        if not log_entries or not self.records:
+            return None, 0.0
+
+        exact = self.records.get(entries_key(log_entries))
+        if exact:
+            return exact, 1.0
+
+        if self.vectors is None:
+            self.build()
+
+        query = self.vectorize(Counter(tokenize(log_entries)))
+        best_record, best_score = None, 0.0
+        for record, vector in self.vectors:
+            score = sum(weight * vector.get(term, 0.0) for term, weight in query.items())
+            if score > best_score:
+                best_record, best_score = record, score
+
+        if best_score < self.threshold:
+            return None, best_score
+        return best_record, best_score
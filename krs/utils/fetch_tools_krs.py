@@ -1,7 +1,8 @@
-import json
+import json, os
 import requests
 import yaml
-from krs.utils.constants import (KUBETOOLS_DATA_JSONURL, KUBETOOLS_JSONPATH, CNCF_YMLPATH, CNCF_YMLURL, CNCF_TOOLS_JSONPATH, TOOLS_RANK_JSONPATH, CATEGORY_RANK_JSONPATH)
+from krs.utils.constants import (KUBETOOLS_DATA_JSONURL, KUBETOOLS_JSONPATH, CNCF_YMLPATH, CNCF_YMLURL, CNCF_TOOLS_JSONPATH, TOOLS_RANK_JSONPATH, CATEGORY_RANK_JSONPATH,
+                                 RECOMMENDATION_INDEX_JSONPATH, RECOMMENDATION_INDEX_VERSION)
 
 # Function to convert 'githubStars' to a float, or return 0 if it cannot be converted
 def get_github_stars(tool):
@@ -74,9 +75,53 @@ def krs_tool_ranking_info():
     save_json_file(cncf_tools_dict, CNCF_TOOLS_JSONPATH)
     save_json_file(tools_dict, TOOLS_RANK_JSONPATH)
     save_json_file(category_tools_dict, CATEGORY_RANK_JSONPATH)
+    build_recommendation_index(tools_dict, category_tools_dict, cncf_tools_dict)
 
     return tools_dict, category_tools_dict, cncf_tools_dict
 
+def build_recommendation_index(tools_dict, category_tools_dict, cncf_tools_dict):
+    """
+    Builds the compact index used by recommendations and saves it next to the ranking files.
+
+    The index holds the tools of every category ordered by rank, the (category, rank) pairs
+    of every tool and the CNCF status of the ranked tools only.
+    """
+    categories = {category: [ranked[rank]['name'] for rank in sorted(ranked, key=int)]
+                  for category, ranked in category_tools_dict.items()}
+    tool_categories = {tool: [[detail['category'], detail['rank']] for detail in details]
+                       for tool, details in tools_dict.items()}
+    cncftools = cncf_tools_dict['cncftools']
+    index = {
+        'version': RECOMMENDATION_INDEX_VERSION,
+        'categories': categories,
+        'tool_categories': tool_categories,
+        'cncf_status': {tool: cncftools[tool] for tool in tool_categories if tool in cncftools}
+    }
+    with open(RECOMMENDATION_INDEX_JSONPATH, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    return index
+
+def load_recommendation_index():
+    """
+    Loads the recommendation index, rebuilding it from the saved ranking files if it is missing or outdated.
+    Returns None if krs has not downloaded the ranking data yet.
+    """
+    if os.path.exists(RECOMMENDATION_INDEX_JSONPATH):
+        with open(RECOMMENDATION_INDEX_JSONPATH) as f:
+            index = json.load(f)
+        if index.get('version') == RECOMMENDATION_INDEX_VERSION:
+            return index
+
+    if not all(os.path.exists(path) for path in (TOOLS_RANK_JSONPATH, CATEGORY_RANK_JSONPATH, CNCF_TOOLS_JSONPATH)):
+        return None
+    with open(TOOLS_RANK_JSONPATH) as f:
+        tools_dict = json.load(f)
+    with open(CATEGORY_RANK_JSONPATH) as f:
+        category_tools_dict = json.load(f)
+    with open(CNCF_TOOLS_JSONPATH) as f:
+        cncf_tools_dict = json.load(f)
+    return build_recommendation_index(tools_dict, category_tools_dict, cncf_tools_dict)
+
 if __name__=='__main__':
     tools_dict, category_tools_dict, cncf_tools_dict = krs_tool_ranking_info()
     print(cncf_tools_dict)
@@ -0,0 +1,128 @@
+from krs.utils.constants import HF_MODELS_DIRECTORY, HF_BENCHMARK_PROMPT
+import os, time
+
+PRECISIONS = ['fp32', 'bf16', 'fp16']
+
+# Options compared by the benchmark, from the default load to the cheapest CPU setup
+BENCHMARK_CONFIGS = {
+    'fp32': {'low_cpu_mem_usage': False},
+    'fp32 low_cpu_mem_usage': {'low_cpu_mem_usage': True},
+    'bf16': {'low_cpu_mem_usage': True, 'precision': 'bf16'},
+    'int8 dynamic': {'low_cpu_mem_usage': True, 'quantize': True, 'cache_quantized': False},
+    'int8 dynamic cached': {'low_cpu_mem_usage': True, 'quantize': True, 'cache_quantized': True},
+}
+
+def quantized_model_path(model_name, revision, torch_version):
+    # The pickled model only matches the weights and the torch release it was built from
+    name = f"{model_name.replace('/', '--')}-{(revision or 'local')[:12]}-torch{torch_version.split('+')[0]}-int8-dynamic.pt"
+    return os.path.join(HF_MODELS_DIRECTORY, name)
+
+def load_huggingface_model(model_name, device='cpu', low_cpu_mem_usage=None, precision='fp32', quantize=False,
+                           threads=None, cache_quantized=True):
+    """
+    Loads a Huggingface causal language model and its tokenizer with options that reduce CPU load time and memory.
+
+    The quantized model is cached as a pickle and loaded with torch.load(weights_only=False), which can run
+    arbitrary code. Only models quantized by krs itself should ever be placed in the cache directory.
+
+    Args:
+        model_name (str): The Huggingface model name.
+        device (str): 'cpu' or 'gpu'.
+        low_cpu_mem_usage (bool): Load the weights without first allocating a randomly initialized copy.
+            Requires the accelerate package. Left to transformers when None.
+        precision (str): One of 'fp32', 'bf16' or 'fp16'. Ignored when quantizing.
+        quantize (bool): Apply dynamic int8 quantization to the linear layers. Only used on CPU.
+        threads (int): Number of threads torch uses for inference on CPU.
+        cache_quantized (bool): Save the quantized model locally and load it directly on later runs.
+
+    Returns:
+        tuple: The tokenizer and the model.
+    """
+    import torch
+    from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    quantize = quantize and device != 'gpu'
+
+    cached_path = None
+    if quantize and cache_quantized:
+        revision = getattr(AutoConfig.from_pretrained(model_name), '_commit_hash', None)
+        cached_path = quantized_model_path(model_name, revision, torch.__version__)
+        if os.path.exists(cached_path):
+            model = torch.load(cached_path, weights_only=False)
+            model.eval()
+            return tokenizer, model
+
+    # Dynamic quantization works on fp32 weights, so the precision option only applies without it
+    dtype = {'bf16': torch.bfloat16, 'fp16': torch.float16}.get(precision, torch.float32) if not quantize else torch.float32
+    kwargs = {'torch_dtype': dtype}
+    if low_cpu_mem_usage is not None:
+        kwargs['low_cpu_mem_usage'] = low_cpu_mem_usage
+    model = AutoModelForCausalLM.from_pretrained(model_name, **kwargs)
+
+    if quantize:
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        if cached_path:
+            os.makedirs(HF_MODELS_DIRECTORY, exist_ok=True)
+            torch.save(model, cached_path)
+
+    model.eval()
+    return tokenizer, model
+
+def cache_quantized_model(model_name, options):
+    load_huggingface_model(model_name, **options)
+
+def peak_memory_mb():
+    import resource, sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def benchmark_run(model_name, options, prompt, max_new_tokens):
+    """
+    Loads the model with the given options and generates from the prompt. Meant to run in a fresh process,
+    so the peak memory only accounts for this configuration.
+    """
+    import torch
+
+    start = time.perf_counter()
+    tokenizer, model = load_huggingface_model(model_name, **options)
+    load_time = time.perf_counter() - start
+
+    inputs = tokenizer(prompt, return_tensors='pt')
+    start = time.perf_counter()
+    with torch.inference_mode():
+        output = model.generate(**inputs, max_new_tokens=max_new_tokens, min_new_tokens=max_new_tokens, do_sample=False)
+    generate_time = time.perf_counter() - start
+    new_tokens = output.shape[-1] - inputs['input_ids'].shape[-1]
+
+    return {
+        'load_seconds': round(load_time, 2),
+        'peak_memory_mb': round(peak_memory_mb()),
+        'tokens_per_second': round(new_tokens / generate_time, 2) if generate_time else None,
+    }
+
+def benchmark_huggingface_model(model_name, configs=None, threads=None, max_new_tokens=32, prompt=HF_BENCHMARK_PROMPT):
+    """
+    Benchmarks the CPU load options of a Huggingface model, running every configuration in its own process.
+
+    Yields:
+        tuple: The configuration name and its results, or the error it failed with.
+    """
+    import multiprocessing
+
+    context = multiprocessing.get_context('spawn')
+    for name, options in (configs or BENCHMARK_CONFIGS).items():
+        options = dict(options, threads=threads)
+        if options.get('cache_quantized') and options.get('quantize'):
+            # Build the cached copy first, so the measured run loads it directly
+            with context.Pool(1) as pool:
+                pool.apply(cache_quantized_model, (model_name, options))
+        try:
+            with context.Pool(1) as pool:
+                yield name, pool.apply(benchmark_run, (model_name, options, prompt, max_new_tokens))
+        except Exception as e:
+            yield name, {'error': str(e)}
@@ -0,0 +1,188 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from krs.utils.cluster_scanner import ScanError
+from krs.utils.fetch_tools_krs import load_recommendation_index
+from krs.utils.functional import CustomJSONEncoder
+from krs.utils.log_analyzer import analyze_pod_logs, available_cpus
+from krs.utils.constants import SERVER_REFRESH_SECONDS
+from datetime import datetime
+import json, logging, multiprocessing, threading
+
+def encode(payload):
+    return json.dumps(payload, cls=CustomJSONEncoder).encode('utf-8')
+
+
+class KrsServerCache:
+    """
+    Keeps the results of the last cluster scan in memory and refreshes them periodically.
+
+    Every response is serialized once per refresh and the whole snapshot is swapped in one
+    assignment, so concurrent readers only do a dictionary lookup.
+    """
+
+    def __init__(self, krs, refresh_interval=SERVER_REFRESH_SECONDS, namespaces=None, exclude_namespaces=None,
+                 label_selector=None, field_selector=None):
+        self.krs = krs
+        self.refresh_interval = refresh_interval
+        self.scope = (namespaces, exclude_namespaces, label_selector, field_selector)
+        self.snapshot = None
+        self.refreshing = False
+        self.last_error = None
+        self.pool = None
+        self.refresh_requested = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.refresh_loop, daemon=True)
+        self.thread.start()
+
+    def request_refresh(self):
+        self.refresh_requested.set()
+
+    def refresh_loop(self):
+        while True:
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logging.error("Failed to refresh the krs server cache, serving the previous scan: %s", e)
+            self.refresh_requested.wait(self.refresh_interval)
+            self.refresh_requested.clear()
+
+    def refresh(self):
+        self.refreshing = True
+        try:
+            pod_list, pod_info, deployments, namespaces = self.krs.scanner.scan_kubernetes_deployment(*self.scope)
+            if not namespaces:
+                # Every cluster has namespaces, an empty scan must not replace a good snapshot
+                raise ScanError("The scan did not return any namespaces")
+            self.snapshot = self.build_snapshot(pod_list, pod_info, deployments, namespaces)
+        finally:
+            self.refreshing = False
+
+    def build_snapshot(self, pod_list, pod_info, deployments, namespaces):
+        scanned_at = datetime.now().isoformat()
+        index = load_recommendation_index() or {'categories': {}, 'tool_categories': {}, 'cncf_status': {}}
+        tools = self.krs.detect_tools_from_repo(pod_list, deployments)
+
+        scan = [{'tool': tool, 'rank': rank, 'category': category, 'cncf_status': index['cncf_status'].get(tool, 'unlisted')}
+                for tool in sorted(tools) for category, rank in index['tool_categories'].get(tool, [])]
+        recommendations = [{'category': category, 'recommendation': recommendation, 'tool': tool, 'cncf_status': status}
+                           for category, recommendation, tool, status in self.krs.recommend_tools(tools, index)]
+        analysis = self.analyze_logs(pod_info)
+        namespace_analysis = {}
+        for result in analysis:
+            namespace_analysis.setdefault(result['namespace'], []).append(result)
+
+        by_namespace = {}
+        for namespace in namespaces:
+            pods = pod_info.get(namespace, [])
+            by_namespace[namespace] = {
+                'pods': encode({'namespace': namespace, 'pods': [pod['name'] for pod in pods], 'scanned_at': scanned_at}),
+                'export': encode({namespace: pods}),
+                'analyze': encode({'results': namespace_analysis.get(namespace, []), 'scanned_at': scanned_at}),
+            }
+
+        return {
+            'scanned_at': scanned_at,
+            'namespaces': encode({'namespaces': namespaces, 'scanned_at': scanned_at}),
+            'pods': encode({'pods': pod_list, 'scanned_at': scanned_at}),
+            'scan': encode({'tools': scan, 'deployments': deployments, 'scanned_at': scanned_at}),
+            'recommend': encode({'recommendations': recommendations, 'scanned_at': scanned_at}),
+            'export': encode(pod_info),
+            'analyze': encode({'results': analysis, 'scanned_at': scanned_at}),
+            'by_namespace': by_namespace,
+        }
+
+    def analyze_logs(self, pod_info):
+        jobs = [(namespace, pod['name'], pod['info'].get('Logs', {})) for namespace, pods in pod_info.items() for pod in pods]
+        if not jobs:
+            return []
+        if self.pool is None:
+            # Refreshes run next to the request threads, forking from there could copy a held lock into the workers
+            self.pool = ProcessPoolExecutor(max_workers=available_cpus(), mp_context=multiprocessing.get_context('spawn'))
+        try:
+            return list(self.pool.map(analyze_pod_logs, *zip(*jobs)))
+        except BrokenProcessPool:
+            # A worker died, start a fresh pool on the next refresh
+            self.pool = None
+            raise
+
+    def get(self, resource, namespace=None):
+        """
+        Returns the serialized response of a resource and its HTTP status.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return 503, encode({'error': 'The first scan of the cluster is still running'})
+        if namespace is None:
+            return 200, snapshot[resource]
+        if namespace not in snapshot['by_namespace']:
+            return 404, encode({'error': f"Namespace '{namespace}' was not found in the scan"})
+        return 200, snapshot['by_namespace'][namespace][resource]
+
+    def status(self):
+        snapshot = self.snapshot
+        return 200, encode({'status': 'ok' if snapshot else 'scanning',
+                            'scanned_at': snapshot['scanned_at'] if snapshot else None,
+                            'refreshing': self.refreshing,
+                            'last_error': self.last_error})
+
+
+class KrsRequestHandler(BaseHTTPRequestHandler):
+
+    cache = None
+    resources = {'namespaces': False, 'pods': True, 'scan': False, 'recommend': False, 'export': True, 'analyze': True}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        resource = url.path.strip('/')
+        namespace = parse_qs(url.query).get('namespace', [None])[0]
+
+        if resource == 'healthz':
+            self.respond(*self.cache.status())
+        elif resource in self.resources:
+            if namespace is not None and not self.resources[resource]:
+                self.respond(400, encode({'error': f"'{resource}' can not be filtered by namespace"}))
+            else:
+                self.respond(*self.cache.get(resource, namespace))
+        else:
+            self.respond(404, encode({'error': f"Unknown endpoint '{url.path}'", 'endpoints': ['healthz'] + list(self.resources)}))
+
+    def do_POST(self):
+        if urlparse(self.path).path.strip('/') == 'refresh':
+            self.cache.request_refresh()
+            self.respond(202, encode({'status': 'refresh requested'}))
+        else:
+            self.respond(404, encode({'error': f"Unknown endpoint '{self.path}'"}))
+
+    def respond(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def serve(cache, host, port):
+    """
+    Serves the cached krs results over HTTP until interrupted.
+    """
+    handler = type('CachedKrsRequestHandler', (KrsRequestHandler,), {'cache': cache})
+    server = ThreadingHTTPServer((host, port), handler)
+    cache.start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -1,11 +1,13 @@
 import pickle
 import subprocess
 import os, time
+from krs.utils.chat_sessions import ChatSessionStore
+from krs.utils.hf_loader import load_huggingface_model
 from krs.utils.constants import (MAX_OUTPUT_TOKENS, LLMSTATE_PICKLE_FILEPATH)
 
 class KrsGPTClient:
 
-    def __init__(self, reinitialize=False, reset_history=False, device='cpu'):
+    def __init__(self, reinitialize=False, reset_history=False, device='cpu', hf_options=None):
 
         self.reinitialize = reinitialize
         self.client = None
@@ -15,18 +17,25 @@ class KrsGPTClient:
         self.openai_api_key = None
         self.continue_chat = False
         self.history = []
+        self.sessions = ChatSessionStore()
+        self.session_id = None
+        self.persist_session = True
         self.max_tokens = MAX_OUTPUT_TOKENS
         self.device = device
+        # Huggingface load options, the ones given here override the saved ones
+        self.hf_options = dict(hf_options or {})
 
 
         if not self.reinitialize:
             print("\nLoading LLM State..")
-            self.load_state()
+            self.load_state(load_history=not reset_history)
             print("\nModel: ", self.model)
         if not self.model:
             self.initialize_client()
 
-        self.history = [] if reset_history == True else self.history
+        if reset_history == True:
+            self.history = []
+            self.session_id = None
 
         if self.history:
             continue_chat = input("\n\nDo you want to continue previous chat ? (y/n) >> ")
@@ -39,23 +48,33 @@ class KrsGPTClient:
                 self.continue_chat = True
 
     def save_state(self, filename=LLMSTATE_PICKLE_FILEPATH):
+        # The chat history is not part of the state, every message is appended to its session log instead
         state = {
             'provider': self.provider,
             'model': self.model,
-            'history': self.history,
+            'session_id': self.session_id,
+            'hf_options': self.hf_options,
             'openai_api_key': self.openai_api_key
         }
         with open(filename, 'wb') as output:
             pickle.dump(state, output, pickle.HIGHEST_PROTOCOL)
 
-    def load_state(self):
+    def load_state(self, load_history=True):
         try:
             with open(LLMSTATE_PICKLE_FILEPATH, 'rb') as f:
                 state = pickle.load(f)
                 self.provider = state['provider']
                 self.model = state['model']
-                self.history = state.get('history', [])
+                self.session_id = state.get('session_id')
+                if state.get('history'):
+                    # State saved before chat sessions were stored as logs
+                    self.start_session()
+                    for message in state['history']:
+                        self.sessions.append(self.session_id, message)
+                if load_history and self.session_id:
+                    self.history = self.sessions.load(self.session_id)
                 self.openai_api_key = state.get('openai_api_key', '')
+                self.hf_options = {**state.get('hf_options', {}), **self.hf_options}
                 if self.provider == 'OpenAI':
                     self.init_openai_client(reinitialize=True)
                 elif self.provider == 'huggingface':
@@ -125,11 +144,13 @@ class KrsGPTClient:
             print("\nInstalling necessary libraries..........")
             self.install_package('transformers')
             self.install_package('torch')
+        if self.hf_options.get('low_cpu_mem_usage'):
+            self.install_package('accelerate')
         
         os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
         import warnings
-        from transformers import pipeline, AutoModelForCausalLM, AutoTokenizer
+        from transformers import pipeline
 
         warnings.filterwarnings("ignore", category=FutureWarning)
 
@@ -137,10 +158,17 @@ class KrsGPTClient:
         self.model = input("\nEnter the Huggingface model name: ") if not reinitialize else self.model
 
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model)
-            self.model_hf = AutoModelForCausalLM.from_pretrained(self.model)
+            self.tokenizer, self.model_hf = load_huggingface_model(self.model, self.device, **self.hf_options)
             self.pipeline = pipeline('text-generation', model=self.model_hf, tokenizer=self.tokenizer, device=0 if self.device == 'gpu' else -1)
 
+        except ImportError as e:
+            if not self.hf_options.get('low_cpu_mem_usage'):
+                raise
+            print("\nError loading model: ", e)
+            print("\nLoading the model without --low-cpu-mem-usage.")
+            self.hf_options.pop('low_cpu_mem_usage')
+            self.init_huggingface_client(reinitialize=True)
+
         except OSError as e:
             print("\nError loading model: ", e)
             print("\nPlease enter a valid Huggingface model name.")
@@ -148,6 +176,39 @@ class KrsGPTClient:
 
         self.save_state()
 
+    def start_session(self, namespace=None, pod=None, persist=True):
+        """
+        Starts a new, empty chat session about the given pod.
+
+        Args:
+            persist (bool): Store the session so it can be resumed. Sessions that are not persisted are
+                kept in memory only and never count against the session retention limit.
+        """
+        self.session_id = self.sessions.create(namespace, pod) if persist else None
+        self.persist_session = persist
+        self.history = []
+        self.continue_chat = False
+
+    def resume_session(self, namespace, pod):
+        """
+        Resumes the latest chat session about the given pod. Returns False if there is none.
+        """
+        session_id = self.sessions.latest(namespace, pod)
+        if session_id is None:
+            return False
+        self.session_id = session_id
+        self.history = self.sessions.load(session_id)
+        self.continue_chat = bool(self.history)
+        return self.continue_chat
+
+    def add_message(self, role, content):
+        if self.session_id is None and self.persist_session:
+            self.start_session()
+        message = {"role": role, "content": content}
+        self.history.append(message)
+        if self.session_id is not None:
+            self.sessions.append(self.session_id, message)
+
     def validate_openai_key(self):
         """Validate the OpenAI API key by attempting a small request."""
         response = self.client.chat.completions.create(
@@ -157,8 +218,8 @@ class KrsGPTClient:
                 )
         print("API key and model are valid.")
 
-    def infer(self, prompt):
-        self.history.append({"role": "user", "content": prompt})
+    def infer(self, prompt, echo=True):
+        self.add_message("user", prompt)
         input_prompt = self.history_to_prompt()
 
         if self.provider == 'OpenAI':
@@ -173,8 +234,10 @@ class KrsGPTClient:
             responses = self.pipeline(input_prompt, max_new_tokens=self.max_tokens)
             output = responses[0]['generated_text']
 
-        self.history.append({"role": "assistant", "content": output})
-        print(">> ", output)
+        self.add_message("assistant", output)
+        if echo:
+            print(">> ", output)
+        return output
 
     def interactive_session(self, prompt_input):
         print("\nInteractive session started. Type 'end chat' to exit from the session!\n")
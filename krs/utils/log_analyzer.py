@@ -0,0 +1,150 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from krs.utils.functional import extract_log_entries
+from krs.utils.pod_watcher import pod_health_signals, pod_key
+from krs.utils.triage import is_pod_ready
+from krs.utils.workloads import resolve_workload, workload_id
+from krs.utils.constants import ANALYZE_FETCH_WORKERS
+import hashlib, multiprocessing, os, re
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def analyze_pod_logs(namespace, pod, container_logs):
+    """
+    Extracts and deduplicates the warning and error entries of a pod's logs. Runs in a worker process.
+    """
+    return {
+        'namespace': namespace,
+        'pod': pod,
+        'log_entries': sorted(extract_log_entries('\n'.join(container_logs.values()))),
+    }
+
+
+def log_fingerprint(log_entries):
+    # Numbers are masked so entries that only differ in ids, addresses or timestamps share a fingerprint
+    normalized = sorted({re.sub(r'\d+', '#', entry) for entry in log_entries})
+    return hashlib.sha1('\n'.join(normalized).encode('utf-8')).hexdigest()[:12]
+
+def pod_status_fingerprint(pod):
+    """
+    Describes the state of a pod that replicas must share to be analyzed only once: the pod template
+    revision, the phase, the readiness and the failure reasons.
+    """
+    labels = pod['metadata'].get('labels') or {}
+    _, reasons = pod_health_signals(pod)
+    return {
+        'revision': labels.get('pod-template-hash') or labels.get('controller-revision-hash'),
+        'phase': (pod.get('status') or {}).get('phase'),
+        'ready': is_pod_ready(pod),
+        'reasons': sorted(f'{container}: {reason}' for container, reason in reasons),
+    }
+
+
+class LogAnalyzer:
+    """
+    Analyzes the logs of many pods without an LLM.
+
+    Logs are fetched by a thread pool and handed to a process pool sized to the available cores,
+    where the CPU bound extraction and deduplication run in parallel. Only a bounded number of pods
+    is in flight at a time, so memory use does not grow with the size of the cluster.
+    """
+
+    def __init__(self, scanner, workers=None, tail_lines=None, fetch_workers=None):
+        self.scanner = scanner
+        self.workers = workers or available_cpus()
+        self.tail_lines = tail_lines
+        self.fetch_workers = fetch_workers or max(ANALYZE_FETCH_WORKERS, self.workers)
+        # Enough pods to keep every fetcher busy and a second batch of logs queued for each worker
+        self.max_in_flight = self.fetch_workers + 2 * self.workers
+
+    def fetch_logs(self, pod):
+        namespace, name = pod_key(pod)
+        containers = [container['name'] for container in pod['spec']['containers']]
+        return namespace, name, self.scanner.fetch_pod_logs(namespace, name, containers, self.tail_lines)
+
+    def analyze(self, pods):
+        """
+        Analyzes the logs of the given pods, yielding a result for every pod as soon as its worker finishes.
+
+        Args:
+            pods (list): Pods as returned by a list call, as dictionaries.
+        """
+        pods = iter(pods)
+        # Workers are spawned, forking while the fetcher threads hold HTTP or logging locks could deadlock them
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetchers, \
+                ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            fetches = set()
+            pending = set()
+            while True:
+                # A fetched pod keeps its slot until its analysis is done, which bounds the logs held in memory
+                for pod in pods:
+                    future = fetchers.submit(self.fetch_logs, pod)
+                    fetches.add(future)
+                    pending.add(future)
+                    if len(pending) >= self.max_in_flight:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in fetches:
+                        fetches.discard(future)
+                        pending.add(pool.submit(analyze_pod_logs, *future.result()))
+                    else:
+                        yield future.result()
+
+    def analyze_workloads(self, pods, replicaset_owners, job_owners):
+        """
+        Analyzes the logs of one representative replica per workload, yielding a report for every workload
+        as soon as all of its representatives are done.
+
+        Replicas are only analyzed separately when their status fingerprint differs, e.g. during a rollout
+        or when some of them crash. The representative of a group is the replica with the most restarts.
+
+        Args:
+            pods (list): Pods as returned by a list call, as dictionaries.
+            replicaset_owners (dict): Controllers of ReplicaSets keyed by (namespace, name).
+            job_owners (dict): Controllers of Jobs keyed by (namespace, name).
+        """
+        workloads = {}
+        for pod in pods:
+            workload = resolve_workload(*pod_key(pod), pod['metadata'].get('ownerReferences'), replicaset_owners, job_owners)
+            status = pod_status_fingerprint(pod)
+            groups = workloads.setdefault(workload, {})
+            groups.setdefault(repr(sorted(status.items())), {'status': status, 'pods': []})['pods'].append(pod)
+
+        representatives = {}
+        remaining = {}
+        for workload, groups in workloads.items():
+            remaining[workload] = len(groups)
+            for group in groups.values():
+                group['pods'].sort(key=lambda pod: (-pod_health_signals(pod)[0], pod['metadata']['name']))
+                representatives[pod_key(group['pods'][0])] = (workload, group)
+
+        for result in self.analyze([group['pods'][0] for _, group in representatives.values()]):
+            workload, group = representatives[(result['namespace'], result['pod'])]
+            group['log_entries'] = result['log_entries']
+            remaining[workload] -= 1
+            if remaining[workload] == 0:
+                yield self.workload_report(workload, workloads[workload].values())
+
+    def workload_report(self, workload, groups):
+        namespace, kind, name = workload
+        groups = [{
+            'representative': group['pods'][0]['metadata']['name'],
+            'pods': [pod['metadata']['name'] for pod in group['pods']],
+            'status': group['status'],
+            'log_entries': group['log_entries'],
+            'fingerprint': log_fingerprint(group['log_entries']),
+        } for group in groups]
+        return {
+            'workload': workload_id(workload),
+            'namespace': namespace,
+            'kind': kind,
+            'name': name,
+            'replicas': sum(len(group['pods']) for group in groups),
+            'groups': groups,
+        }
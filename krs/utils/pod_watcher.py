@@ -0,0 +1,222 @@
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+from krs.utils.functional import extract_log_entries
+from krs.utils.cluster_scanner import merge_field_selectors
+from krs.utils.workloads import controller_of, resolve_workload, workload_id
+from krs.utils.constants import (UNHEALTHY_WAITING_REASONS, UNHEALTHY_TERMINATED_REASONS, WATCH_DEBOUNCE_SECONDS,
+                                 WATCH_COOLDOWN_SECONDS, WATCH_LOG_TAIL_LINES)
+from datetime import datetime, timezone
+import json, logging, time
+
+def pod_health_signals(pod):
+    """
+    Collects the restart count and failure reasons of a pod from its container statuses.
+
+    Args:
+        pod (dict): The pod as returned by the API, without deserializing it into a V1Pod.
+
+    Returns:
+        tuple: The total restart count and a set of (container, reason) pairs.
+    """
+    restarts = 0
+    reasons = set()
+    status = pod.get('status') or {}
+    for container_status in (status.get('initContainerStatuses') or []) + (status.get('containerStatuses') or []):
+        restarts += container_status.get('restartCount') or 0
+        state, last_state = container_status.get('state') or {}, container_status.get('lastState') or {}
+        waiting = state.get('waiting') or {}
+        if waiting.get('reason') in UNHEALTHY_WAITING_REASONS:
+            reasons.add((container_status['name'], waiting['reason']))
+        for terminated in (state.get('terminated'), last_state.get('terminated')):
+            if terminated and terminated.get('reason') in UNHEALTHY_TERMINATED_REASONS:
+                reasons.add((container_status['name'], terminated['reason']))
+    return restarts, reasons
+
+def pod_key(pod):
+    return pod['metadata']['namespace'], pod['metadata']['name']
+
+
+class PodWatcher:
+    """
+    Keeps a pod watch stream open and yields a finding for every pod that turns unhealthy.
+
+    Logs are only fetched for pods that transition into a failure state, so the work done
+    scales with the number of failures instead of the size of the cluster.
+    """
+
+    def __init__(self, core_v1, namespace=None, exclude_namespaces=None, label_selector=None, field_selector=None,
+                 debounce=WATCH_DEBOUNCE_SECONDS, cooldown=WATCH_COOLDOWN_SECONDS, tail_lines=WATCH_LOG_TAIL_LINES,
+                 report_existing=False, list_owners=None):
+        self.v2 = core_v1
+        self.namespace = namespace
+        self.label_selector = label_selector
+        self.field_selector = merge_field_selectors(field_selector, None if namespace else exclude_namespaces)
+        self.debounce = debounce
+        self.cooldown = cooldown
+        self.tail_lines = tail_lines
+        self.report_existing = report_existing
+        # Called with a list of namespaces, returns the controllers of ReplicaSets and Jobs
+        self.list_owners = list_owners
+        self.replicaset_owners = {}
+        self.job_owners = {}
+        self.unresolved_owners = set()
+        self.seen = {}
+        self.pending = {}
+        self.last_analyzed = {}
+
+    def list_kwargs(self):
+        kwargs = {}
+        if self.namespace:
+            kwargs['namespace'] = self.namespace
+        if self.label_selector:
+            kwargs['label_selector'] = self.label_selector
+        if self.field_selector:
+            kwargs['field_selector'] = self.field_selector
+        return kwargs
+
+    def stream_kwargs(self, resource_version):
+        kwargs = self.list_kwargs()
+        kwargs['timeout_seconds'] = max(1, int(self.debounce))
+        if resource_version:
+            kwargs['resource_version'] = resource_version
+        return kwargs
+
+    def sync(self, list_fn, initial=False):
+        """
+        Lists the watched pods and returns the resource version to resume the watch from.
+
+        On the initial sync pods are only recorded, so pods that were already failing before the
+        watch started are not reported unless report_existing is set. On a resync after the watch
+        expired, the listed pods are compared against what was seen to catch missed transitions.
+        """
+        self.load_owners([self.namespace] if self.namespace else None)
+        pods = json.loads(list_fn(_preload_content=False, **self.list_kwargs()).data)
+        listed = set()
+        for pod in pods.get('items', []):
+            key = pod_key(pod)
+            listed.add(key)
+            if initial and not self.report_existing:
+                self.seen[key] = pod_health_signals(pod)
+            else:
+                self.handle_event('MODIFIED', pod)
+        # Pods deleted while the watch was down never got a DELETED event
+        for key in set(self.seen) - listed:
+            self.handle_event('DELETED', None, key)
+        return pods['metadata'].get('resourceVersion')
+
+    def load_owners(self, namespaces=None):
+        if not self.list_owners:
+            return
+        try:
+            replicaset_owners, job_owners = self.list_owners(namespaces)
+        except ApiException as e:
+            # Without access to ReplicaSets or Jobs, pods fall back to their direct controller
+            logging.warning("Could not list ReplicaSet and Job owners, cooldowns apply per direct controller: %s", e)
+            if e.status in (401, 403):
+                self.list_owners = None
+            return
+        self.replicaset_owners.update(replicaset_owners)
+        self.job_owners.update(job_owners)
+
+    def workload_of(self, pod):
+        """
+        Resolves the workload of a pod, following ReplicaSets up to their Deployment and Jobs up to their CronJob,
+        so replicas of every revision of a rollout share it.
+
+        Returns:
+            tuple: The namespace, kind and name of the workload.
+        """
+        namespace, name = pod_key(pod)
+        owner_references = pod['metadata'].get('ownerReferences')
+        owner = controller_of(owner_references)
+        owners = {'ReplicaSet': self.replicaset_owners, 'Job': self.job_owners}.get(owner[0]) if owner else None
+        if owners is not None and (namespace, owner[1]) not in owners and (namespace, owner[1]) not in self.unresolved_owners:
+            # Created after the owners were listed, e.g. by a new rollout
+            self.load_owners([namespace])
+            if (namespace, owner[1]) not in owners:
+                self.unresolved_owners.add((namespace, owner[1]))
+        return resolve_workload(namespace, name, owner_references, self.replicaset_owners, self.job_owners)
+
+    def watch(self):
+        """
+        Watches pods until interrupted, yielding finding dictionaries for unhealthy pods.
+        """
+        list_fn = self.v2.list_namespaced_pod if self.namespace else self.v2.list_pod_for_all_namespaces
+        resource_version = self.sync(list_fn, initial=True)
+        while True:
+            stream = watch.Watch()
+            try:
+                for event in stream.stream(list_fn, **self.stream_kwargs(resource_version)):
+                    if event['type'] == 'ERROR':
+                        resource_version = None
+                        break
+                    # The raw object skips the V1Pod model, every check reads the API's JSON directly
+                    pod = event['raw_object']
+                    resource_version = pod['metadata'].get('resourceVersion')
+                    self.handle_event(event['type'], pod)
+                    yield from self.flush()
+            except ApiException as e:
+                if e.status != 410:
+                    raise
+                # The resource version is too old, start over with a fresh list
+                resource_version = None
+            finally:
+                stream.stop()
+            if resource_version is None:
+                resource_version = self.sync(list_fn)
+            yield from self.flush()
+
+    def handle_event(self, event_type, pod, key=None):
+        key = key or pod_key(pod)
+        if event_type == 'DELETED':
+            self.seen.pop(key, None)
+            self.pending.pop(key, None)
+            return
+
+        restarts, reasons = pod_health_signals(pod)
+        previous_restarts, previous_reasons = self.seen.get(key, (restarts, set()))
+        self.seen[key] = (restarts, reasons)
+
+        if restarts > previous_restarts or reasons - previous_reasons:
+            pending = self.pending.setdefault(key, {'first_seen': time.monotonic(), 'reasons': set()})
+            pending['reasons'] |= reasons
+            pending['restarts'] = restarts
+            pending['pod'] = pod
+
+    def flush(self):
+        now = time.monotonic()
+        for cooldown_key in [key for key, analyzed in self.last_analyzed.items() if now - analyzed >= self.cooldown]:
+            del self.last_analyzed[cooldown_key]
+
+        for key in [key for key, pending in self.pending.items() if now - pending['first_seen'] >= self.debounce]:
+            pending = self.pending.pop(key)
+            # Replicas failing for the same reasons share a cooldown, so a workload is analyzed once
+            cooldown_key = (self.workload_of(pending['pod']), frozenset(pending['reasons']))
+            if cooldown_key in self.last_analyzed:
+                continue
+            self.last_analyzed[cooldown_key] = now
+            yield self.analyze(pending['pod'], pending['reasons'], pending['restarts'])
+
+    def analyze(self, pod, reasons, restarts):
+        namespace, name = pod_key(pod)
+        containers = sorted({container for container, _ in reasons}) or [container['name'] for container in pod['spec']['containers']]
+        logs = [self.fetch_logs(namespace, name, container) for container in containers]
+        return {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'namespace': namespace,
+            'pod': name,
+            'workload': workload_id(self.workload_of(pod)),
+            'reasons': sorted(f'{container}: {reason}' for container, reason in reasons),
+            'restarts': restarts,
+            'log_entries': sorted(extract_log_entries('\n'.join(logs))),
+        }
+
+    def fetch_logs(self, namespace, pod, container):
+        # Logs of the previous container instance explain a crash best, fall back to the current one
+        for previous in (True, False):
+            try:
+                return self.v2.read_namespaced_pod_log(name=pod, namespace=namespace, container=container,
+                                                       previous=previous, tail_lines=self.tail_lines)
+            except ApiException as e:
+                logging.debug("Failed to fetch logs for container %s in pod %s (previous=%s): %s", container, pod, previous, e)
+        return ""
@@ -0,0 +1,65 @@
+from krs.utils.pod_watcher import pod_health_signals, pod_key
+
+# Weights of the health signals, a higher score means a less healthy pod
+REASON_WEIGHT = 30
+RESTART_WEIGHT = 5
+MAX_COUNTED_RESTARTS = 20
+WARNING_EVENT_WEIGHT = 2
+MAX_COUNTED_WARNING_EVENTS = 25
+NOT_READY_WEIGHT = 15
+PHASE_WEIGHTS = {'Failed': 40, 'Unknown': 20, 'Pending': 15}
+
+def is_pod_ready(pod):
+    for condition in (pod.get('status') or {}).get('conditions') or []:
+        if condition.get('type') == 'Ready':
+            return condition.get('status') == 'True'
+    return False
+
+def pod_health_score(pod, warning_events=0):
+    """
+    Scores the health of a pod from its list response and the number of Warning events about it.
+
+    Args:
+        pod (dict): The pod as returned by a list call, without deserializing it into a V1Pod.
+        warning_events (int): The number of Warning events involving the pod.
+
+    Returns:
+        dict: The score along with the signals it was computed from.
+    """
+    restarts, reasons = pod_health_signals(pod)
+    phase = (pod.get('status') or {}).get('phase') or 'Unknown'
+    ready = is_pod_ready(pod)
+
+    score = REASON_WEIGHT * len(reasons)
+    score += RESTART_WEIGHT * min(restarts, MAX_COUNTED_RESTARTS)
+    score += WARNING_EVENT_WEIGHT * min(warning_events, MAX_COUNTED_WARNING_EVENTS)
+    score += PHASE_WEIGHTS.get(phase, 0)
+    if phase == 'Running' and not ready:
+        score += NOT_READY_WEIGHT
+
+    return {
+        'namespace': pod['metadata']['namespace'],
+        'pod': pod['metadata']['name'],
+        'score': score,
+        'phase': phase,
+        'ready': ready,
+        'restarts': restarts,
+        'warnings': warning_events,
+        'reasons': sorted(f'{container}: {reason}' for container, reason in reasons),
+    }
+
+def rank_pods(pods, warning_counts, top=None, include_healthy=False):
+    """
+    Ranks pods from the least to the most healthy.
+
+    Args:
+        pods (list): Pods as returned by a list call, as dictionaries.
+        warning_counts (dict): Warning event counts keyed by (namespace, pod name).
+        top (int): Only return this many pods.
+        include_healthy (bool): Also return pods with a score of zero.
+    """
+    scores = [pod_health_score(pod, warning_counts.get(pod_key(pod), 0)) for pod in pods]
+    if not include_healthy:
+        scores = [score for score in scores if score['score'] > 0]
+    scores.sort(key=lambda score: (-score['score'], score['namespace'], score['pod']))
+    return scores[:top] if top else scores
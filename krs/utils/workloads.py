@@ -0,0 +1,31 @@
+def controller_of(owner_references):
+    """
+    Returns the (kind, name) of the controller among the owner references of an object, or None.
+
+    Args:
+        owner_references (list): Owner references as dictionaries with 'kind', 'name' and 'controller' keys.
+    """
+    for reference in owner_references or []:
+        if reference.get('controller'):
+            return reference['kind'], reference['name']
+    return None
+
+def resolve_workload(namespace, pod, owner_references, replicaset_owners, job_owners):
+    """
+    Resolves the workload a pod belongs to, following ReplicaSets up to their Deployment and Jobs up to their CronJob.
+
+    Returns:
+        tuple: The namespace, kind and name of the workload. Pods without a controller are their own workload.
+    """
+    owner = controller_of(owner_references)
+    if owner is None:
+        return namespace, 'Pod', pod
+    kind, name = owner
+    if kind == 'ReplicaSet':
+        kind, name = replicaset_owners.get((namespace, name), owner)
+    elif kind == 'Job':
+        kind, name = job_owners.get((namespace, name), owner)
+    return namespace, kind, name
+
+def workload_id(workload):
+    return '/'.join(workload)